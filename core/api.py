@@ -0,0 +1,144 @@
+"""
+Read-only JSON API.
+
+Endpoints are :class:`ValuesAPIView` subclasses that declare the public field
+names they expose. Rows are serialised straight from ``.values()`` so no model
+instances are built, pages are keyset-paginated with
+:class:`core.pagination.CursorPaginator`, and responses carry
+``Cache-Control``/``ETag`` headers so clients and proxies can reuse them.
+
+Query parameters:
+
+``fields``
+    Comma-separated subset of the endpoint's fields.
+``limit``
+    Page size, capped at ``max_page_size``.
+``cursor``
+    Opaque token taken from a previous response's ``next``/``previous``.
+
+Any other parameter is handed to the endpoint's filterset. Search filters
+narrow the rows down but results always come back in ``ordering``, which is
+what keeps cursors stable.
+"""
+
+from django.conf import settings
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_response_headers,
+    set_response_etag,
+)
+from django.views import View
+
+from .pagination import CursorPaginator, InvalidCursor
+
+
+class APIError(Exception):
+    def __init__(self, message: str, status: int = 400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {"error": message, **extra}
+
+
+class ValuesAPIView(View):
+    model = None
+    filterset_class = None
+    # Public field name -> ORM lookup or expression.
+    api_fields: dict = {}
+    # Fields returned when ``fields`` is not given; all of them when empty.
+    default_fields: tuple[str, ...] = ()
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_fields(self) -> list[str]:
+        raw = self.request.GET.get("fields")
+        if not raw:
+            return list(self.default_fields or self.api_fields)
+        fields = list(dict.fromkeys(name.strip() for name in raw.split(",")))
+        fields = [name for name in fields if name]
+        unknown = [name for name in fields if name not in self.api_fields]
+        if unknown or not fields:
+            raise APIError(
+                "Unknown field requested.",
+                unknown=unknown,
+                available=list(self.api_fields),
+            )
+        return fields
+
+    def get_page_size(self) -> int:
+        raw = self.request.GET.get("limit")
+        if not raw:
+            return self.page_size
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise APIError("limit must be an integer.")
+        if limit < 1:
+            raise APIError("limit must be positive.")
+        return min(limit, self.max_page_size)
+
+    def filter_queryset(self, queryset):
+        if self.filterset_class is None:
+            return queryset
+        filterset = self.filterset_class(
+            self.request.GET, queryset=queryset, request=self.request
+        )
+        if not filterset.is_valid():
+            raise APIError("Invalid filter.", errors=filterset.errors)
+        return filterset.qs
+
+    def project(self, queryset, fields: list[str]):
+        """``.values()`` over the requested fields plus the pagination key."""
+
+        key_fields = [name.lstrip("-") for name in self.ordering]
+        columns, expressions = [], {}
+        for name in dict.fromkeys([*fields, *key_fields]):
+            lookup = self.api_fields.get(name, name)
+            if lookup == name:
+                columns.append(name)
+            elif isinstance(lookup, str):
+                expressions[name] = F(lookup)
+            else:
+                expressions[name] = lookup
+        return queryset.values(*columns, **expressions)
+
+    def page_url(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.cursor_query_param] = cursor
+        return f"{self.request.path}?{params.urlencode()}"
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = self.get_fields()
+            page_size = self.get_page_size()
+            queryset = self.project(self.filter_queryset(self.get_queryset()), fields)
+            paginator = CursorPaginator(queryset, page_size, self.ordering)
+            try:
+                page = paginator.page(request.GET.get(self.cursor_query_param))
+            except InvalidCursor:
+                raise APIError("Invalid cursor.")
+        except APIError as exc:
+            return JsonResponse(exc.payload, status=exc.status)
+
+        response = JsonResponse(
+            {
+                "results": [{name: row[name] for name in fields} for row in page],
+                "next": self.page_url(page.next_cursor),
+                "previous": self.page_url(page.previous_cursor),
+            }
+        )
+        patch_response_headers(response, settings.API_CACHE_SECONDS)
+        patch_cache_control(response, public=True)
+        set_response_etag(response)
+        return get_conditional_response(
+            request, etag=response["ETag"], response=response
+        )
@@ -0,0 +1,181 @@
+"""
+Namespaced application cache.
+
+Every cached value belongs to a :class:`Namespace`. Keys embed version stamps,
+so invalidation never has to find and delete keys: bumping a stamp makes every
+key built on it unreachable and the old entries simply expire.
+
+Two kinds of stamps exist:
+
+* the namespace stamp, bumped by ``invalidate()``, retires everything in the
+  namespace;
+* scope stamps such as ``("tutor", 7)``, bumped by ``invalidate("tutor", 7)``,
+  retire only the keys that declared them in ``depends_on``.
+
+Stamps are ``time.time_ns()`` values rather than counters so a stamp evicted
+from the cache can never come back with a previously used value.
+
+``get_or_set`` recomputes a missing value in one process only: the first
+caller takes a short lock while the others wait for its result. Hits and
+misses are counted per namespace in the cache itself, so the numbers are
+shared across worker processes.
+"""
+
+import time
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+T = TypeVar("T")
+
+Scope = tuple[Hashable, ...]
+
+_MISSING = object()
+
+# Namespaces by name, for stats reporting.
+registry: dict[str, "Namespace"] = {}
+
+
+class Namespace:
+    def __init__(self, name: str, alias: str = "default"):
+        self.name = name
+        self.alias = alias
+        registry[name] = self
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    # Versions -------------------------------------------------------------
+
+    def _version_key(self, scope: Scope) -> str:
+        return ":".join(["version", self.name, *map(str, scope)])
+
+    def versions(self, scopes: Iterable[Scope]) -> dict[Scope, int]:
+        """Current stamps for ``scopes``, creating the missing ones."""
+
+        keys = {scope: self._version_key(scope) for scope in scopes}
+        found = self.cache.get_many(list(keys.values()))
+        missing = [key for key in keys.values() if key not in found]
+        if missing:
+            for key in missing:
+                self.cache.add(key, time.time_ns(), None)
+            found.update(self.cache.get_many(missing))
+        return {scope: found.get(key, 0) for scope, key in keys.items()}
+
+    def invalidate(self, *scope: Hashable) -> None:
+        """Retire the whole namespace, or only keys depending on ``scope``."""
+
+        self.cache.set(self._version_key(scope), time.time_ns(), None)
+
+    def key(self, *parts: Hashable, depends_on: Iterable[Scope] = ()) -> str:
+        return self.keys([(parts, depends_on)])[0]
+
+    def keys(
+        self, entries: Iterable[tuple[Iterable[Hashable], Iterable[Scope]]]
+    ) -> list[str]:
+        """:meth:`key` for each ``(parts, depends_on)``, reading all the stamps
+        they need at once."""
+
+        entries = [(parts, [(), *depends_on]) for parts, depends_on in entries]
+        versions = self.versions({scope for _, scopes in entries for scope in scopes})
+        return [
+            ":".join(
+                [
+                    self.name,
+                    ".".join(str(versions[scope]) for scope in scopes),
+                    *map(str, parts),
+                ]
+            )
+            for parts, scopes in entries
+        ]
+
+    # Values ---------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        found = self.cache.get_many(keys)
+        self._count("hits", len(found))
+        self._count("misses", len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: Any, timeout=DEFAULT_TIMEOUT) -> None:
+        self.cache.set(key, value, timeout)
+
+    def set_many(self, values: dict[str, Any], timeout=DEFAULT_TIMEOUT) -> None:
+        if values:
+            self.cache.set_many(values, timeout)
+
+    def get_or_set(
+        self, key: str, default: Callable[[], T], timeout=DEFAULT_TIMEOUT
+    ) -> T:
+        """Return the cached value, computing it in one process on a miss."""
+
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = f"lock:{key}"
+        lock_timeout = settings.CACHE_LOCK_TIMEOUT
+        locked = self.cache.add(lock_key, 1, lock_timeout)
+        if not locked:
+            # Another process is computing the value; give it a moment.
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+                value = self.cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+        try:
+            value = default()
+            self.set(key, value, timeout)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+        return value
+
+    # Stats ----------------------------------------------------------------
+
+    def _stats_key(self, kind: str) -> str:
+        return f"stats:{self.name}:{kind}"
+
+    def _count(self, kind: str, delta: int = 1) -> None:
+        if not delta:
+            return
+        key = self._stats_key(kind)
+        try:
+            self.cache.incr(key, delta)
+        except ValueError:
+            # The first count, or the counter was evicted.
+            if not self.cache.add(key, delta, None):
+                self.cache.incr(key, delta)
+
+    def stats(self) -> dict:
+        keys = {kind: self._stats_key(kind) for kind in ("hits", "misses")}
+        found = self.cache.get_many(list(keys.values()))
+        hits, misses = found.get(keys["hits"], 0), found.get(keys["misses"], 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self) -> None:
+        self.cache.delete_many([self._stats_key("hits"), self._stats_key("misses")])
+
+
+def cache_stats() -> dict[str, dict]:
+    """Hit/miss counters of every registered namespace."""
+
+    return {name: namespace.stats() for name, namespace in sorted(registry.items())}
@@ -0,0 +1,96 @@
+"""
+Conditional GET for read-mostly pages.
+
+A view decorated with :func:`conditional_page` is given a ``freshness``
+function that cheaply summarises everything the response depends on (usually
+a single aggregate query) without rendering it. The summary is hashed into an
+ETag, its newest timestamp becomes ``Last-Modified``, and Django's
+``condition`` machinery answers ``304 Not Modified`` when the client's copy
+still matches.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+class Freshness:
+    """What a response depends on: opaque ``validators`` plus a timestamp."""
+
+    def __init__(self, validators, last_modified: datetime | None = None):
+        self.validators = list(validators)
+        self.last_modified = last_modified
+
+
+def latest(*values) -> datetime | None:
+    timestamps = [value for value in values if value is not None]
+    return max(timestamps) if timestamps else None
+
+
+def _viewer_validators(request) -> list:
+    user = request.user
+    if not user.is_authenticated:
+        return [None]
+    return [user.pk, user.updated_at, user.last_login]
+
+
+def conditional_page(freshness, per_viewer: bool = True):
+    """Emit ETag/Last-Modified from ``freshness(request, *args, **kwargs)``.
+
+    ``freshness`` returns a :class:`Freshness`, or ``None`` to skip validation
+    (e.g. when the object does not exist and the view is about to 404). With
+    ``per_viewer`` the ETag also covers the logged-in user, since the pages
+    render user-specific navigation and actions. Responses carrying one-shot
+    flash messages are never validated.
+    """
+
+    def decorator(view):
+        def _state(request, *args, **kwargs):
+            if not hasattr(request, "_freshness"):
+                if per_viewer and len(get_messages(request)):
+                    request._freshness = None
+                else:
+                    request._freshness = freshness(request, *args, **kwargs)
+            return request._freshness
+
+        def etag_func(request, *args, **kwargs):
+            state = _state(request, *args, **kwargs)
+            if state is None:
+                return None
+            validators = state.validators
+            if per_viewer:
+                validators = [*validators, *_viewer_validators(request)]
+            digest = hashlib.sha1(repr(validators).encode(), usedforsecurity=False)
+            return digest.hexdigest()
+
+        def last_modified_func(request, *args, **kwargs):
+            state = _state(request, *args, **kwargs)
+            if state is None:
+                return None
+            if per_viewer and request.user.is_authenticated:
+                return latest(
+                    state.last_modified,
+                    request.user.updated_at,
+                    request.user.last_login,
+                )
+            return state.last_modified
+
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified_func
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header("ETag"):
+                # Let browsers keep the copy but revalidate it on every use.
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
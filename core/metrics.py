@@ -0,0 +1,359 @@
+"""
+Request timing and latency histograms.
+
+:class:`ServerTimingMiddleware` splits every request into database, template
+and remaining view time, reports the split to staff in a ``Server-Timing``
+header and records it in per-URL-name histograms.
+
+Observations are accumulated in process and, on a Redis or memcached cache,
+flushed into it as deltas every ``METRICS_FLUSH_INTERVAL`` seconds through
+atomic increments, so :func:`metrics_view` reports the totals of every worker
+process. Any other cache cannot add up processes safely, so the histograms
+stay in the process and the ``core.W001`` check warns that /metrics only
+covers the process serving the scrape.
+"""
+
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+METRIC_PREFIX = "mentorme"
+
+# Cache backends shared by all worker processes, with an atomic incr.
+SHARED_CACHE_BACKENDS = {
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+    "django_redis.cache.RedisCache",
+}
+
+
+def shares_cache(alias: str = "default") -> bool:
+    return settings.CACHES[alias]["BACKEND"] in SHARED_CACHE_BACKENDS
+
+
+@checks.register
+def check_metrics_cache(app_configs, **kwargs):
+    if (
+        settings.DEBUG
+        or settings.TESTING
+        or settings.METRICS_SINGLE_PROCESS
+        or shares_cache()
+    ):
+        return []
+    return [
+        checks.Warning(
+            "/metrics only reports the requests of the process serving it.",
+            hint=(
+                "Point CACHE_URL at Redis or memcached to add up every worker "
+                "process, or set METRICS_SINGLE_PROCESS=True when the site runs "
+                "as a single process."
+            ),
+            id="core.W001",
+        )
+    ]
+
+
+# Label for requests that did not resolve to a URL pattern, e.g. 404s.
+UNMATCHED = "<unmatched>"
+
+_current: ContextVar["RequestTiming | None"] = ContextVar(
+    "request_timing", default=None
+)
+
+
+class RequestTiming:
+    """Time spent in the database and in templates during one request."""
+
+    def __init__(self, queries=None):
+        # The live core.querybudget.QueryCounter of the request.
+        self.queries = queries
+        self.template = 0.0
+        self._depth = 0
+
+    @property
+    def db(self) -> float:
+        return self.queries.duration if self.queries else 0.0
+
+    @property
+    def query_count(self) -> int:
+        return self.queries.count if self.queries else 0
+
+    @contextmanager
+    def rendering(self):
+        # Templates rendered from inside another template (cached tiles,
+        # inclusion tags) are already part of the outer render.
+        outermost = not self._depth
+        self._depth += 1
+        start, db_start = time.perf_counter(), self.db
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if outermost:
+                # Lazy querysets evaluated by the template are database time.
+                elapsed = time.perf_counter() - start
+                self.template += elapsed - (self.db - db_start)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+        with timing.rendering():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend reporting render time to the current request."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class Histograms:
+    """Per-view request histograms, shared between processes via the cache
+    when it is a Redis or memcached one and kept in process otherwise."""
+
+    FIELDS = ("count", "sum", "db", "template", "queries")
+    VIEWS_KEY = "metrics:views"
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._pending: Counter[str] = Counter()
+        self._views: set[str] = set()
+        self._flushed_at = time.monotonic()
+        # Totals of this process alone, on caches that cannot share them.
+        self._totals: Counter[str] = Counter()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, view: str, field: str) -> str:
+        return f"metrics:{view}:{field}"
+
+    def observe(
+        self, view: str, total: float, db: float, template: float, queries: int
+    ) -> None:
+        # Buckets are stored non-cumulative; bucket len(buckets) is +Inf.
+        bucket = bisect_left(settings.METRICS_BUCKETS, total)
+        with self._lock:
+            pending = self._pending
+            pending[self._key(view, f"bucket{bucket}")] += 1
+            pending[self._key(view, "count")] += 1
+            # incr only takes integers, so durations are kept in microseconds.
+            pending[self._key(view, "sum")] += round(total * 1e6)
+            pending[self._key(view, "db")] += round(db * 1e6)
+            pending[self._key(view, "template")] += round(template * 1e6)
+            pending[self._key(view, "queries")] += queries
+            self._views.add(view)
+            due = time.monotonic() - self._flushed_at >= settings.METRICS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add this process's observations to the shared totals."""
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            views = set(self._views)
+            self._flushed_at = time.monotonic()
+            if not shares_cache(self.alias):
+                self._totals.update(pending)
+                return
+
+        if pending:
+            self._increment(pending)
+
+        # Concurrent writers may drop each other's names; every process
+        # re-adds its own on the next flush.
+        known = set(self.cache.get(self.VIEWS_KEY, ()))
+        if not views <= known:
+            self.cache.set(self.VIEWS_KEY, sorted(views | known), None)
+
+    def _increment(self, deltas: Counter[str]) -> None:
+        cache = self.cache
+        if isinstance(cache, RedisCache):
+            # One round trip for the whole batch. Integers are stored as
+            # plain Redis integers, so INCRBY works on the cache's own keys.
+            pipeline = cache._cache.get_client(write=True).pipeline(transaction=False)
+            for key, delta in deltas.items():
+                pipeline.incrby(cache.make_and_validate_key(key), delta)
+            pipeline.execute()
+            return
+        # memcached has no batched increment.
+        for key, delta in deltas.items():
+            if not cache.add(key, delta, None):
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    cache.set(key, delta, None)
+
+    def _fields(self) -> list[str]:
+        buckets = len(settings.METRICS_BUCKETS) + 1
+        return [*self.FIELDS, *(f"bucket{i}" for i in range(buckets))]
+
+    def snapshot(self) -> dict[str, dict]:
+        self.flush()
+        fields = self._fields()
+        if shares_cache(self.alias):
+            views = self.cache.get(self.VIEWS_KEY, [])
+            found = self.cache.get_many(
+                [self._key(view, field) for view in views for field in fields]
+            )
+        else:
+            with self._lock:
+                views, found = sorted(self._views), self._totals.copy()
+        return {
+            view: {field: found.get(self._key(view, field), 0) for field in fields}
+            for view in views
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._views.clear()
+            self._totals.clear()
+        if shares_cache(self.alias):
+            views = self.cache.get(self.VIEWS_KEY, [])
+            self.cache.delete_many(
+                [self.VIEWS_KEY]
+                + [self._key(view, field) for view in views for field in self._fields()]
+            )
+
+
+histograms = Histograms()
+
+
+def shows_server_timing(request) -> bool:
+    """Whether the response may reveal database time and query counts."""
+
+    if settings.DEBUG or settings.SERVER_TIMING_PUBLIC:
+        return True
+    user = getattr(request, "user", None)
+    return user is not None and user.is_staff
+
+
+class ServerTimingMiddleware:
+    """
+    Must come after ``core.querybudget.QueryBudgetMiddleware``, whose query
+    counter provides the database time. The ``Server-Timing`` header is only
+    sent to staff, in DEBUG or with ``SERVER_TIMING_PUBLIC``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming(getattr(request, "query_stats", None))
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        db, template = timing.db, timing.template
+        if shows_server_timing(request):
+            view = max(total - db - template, 0.0)
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={db * 1000:.1f};desc="{timing.query_count} queries"',
+                    f"tpl;dur={template * 1000:.1f}",
+                    f"view;dur={view * 1000:.1f}",
+                    f"total;dur={total * 1000:.1f}",
+                ]
+            )
+
+        match = request.resolver_match
+        histograms.observe(
+            match.view_name if match else UNMATCHED,
+            total,
+            db,
+            template,
+            timing.query_count,
+        )
+        return response
+
+
+def _label(value: str) -> str:
+    escaped = value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+    return f'view="{escaped}"'
+
+
+def render_prometheus(snapshot: dict[str, dict]) -> str:
+    """Prometheus text exposition of a :meth:`Histograms.snapshot`."""
+
+    duration = f"{METRIC_PREFIX}_request_duration_seconds"
+    lines = [
+        f"# HELP {duration} Request duration by URL name.",
+        f"# TYPE {duration} histogram",
+    ]
+    bounds = [*map(str, settings.METRICS_BUCKETS), "+Inf"]
+    for view, values in snapshot.items():
+        label = _label(view)
+        cumulative = 0
+        for i, bound in enumerate(bounds):
+            cumulative += values[f"bucket{i}"]
+            lines.append(f'{duration}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f"{duration}_sum{{{label}}} {values['sum'] / 1e6}")
+        lines.append(f"{duration}_count{{{label}}} {values['count']}")
+
+    counters = (
+        ("db_seconds_total", "db", "Time spent in SQL queries.", 1e6),
+        ("template_seconds_total", "template", "Time spent rendering templates.", 1e6),
+        ("queries_total", "queries", "SQL queries run.", 1),
+    )
+    for suffix, field, help_text, scale in counters:
+        name = f"{METRIC_PREFIX}_request_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for view, values in snapshot.items():
+            value = values[field] / scale if scale != 1 else values[field]
+            lines.append(f"{name}{{{_label(view)}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _has_token(request) -> bool:
+    token = settings.METRICS_TOKEN
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
+
+def metrics_view(request):
+    """Prometheus scrape target for staff sessions or the METRICS_TOKEN."""
+
+    if _has_token(request):
+        return _metrics_response()
+    return _staff_metrics(request)
+
+
+@staff_member_required
+def _staff_metrics(request):
+    return _metrics_response()
+
+
+def _metrics_response():
+    return HttpResponse(
+        render_prometheus(histograms.snapshot()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,173 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the ordering key of the row they start after, encoded
+into an opaque token, so deep pages cost the same as the first one and no
+``COUNT(*)`` is ever issued.
+"""
+
+import base64
+import datetime
+import json
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds, which would break the
+        # equality comparison on the tie-breaking key.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginate a queryset on a unique ``ordering`` key."""
+
+    def __init__(self, queryset, per_page, ordering=("-created_at", "-id")):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+
+    def encode_cursor(self, obj, direction: str) -> str:
+        # Rows from ``.values()`` querysets are dicts rather than instances.
+        if isinstance(obj, dict):
+            key = [obj[field] for field in self.fields]
+        else:
+            key = [getattr(obj, field) for field in self.fields]
+        payload = {"d": direction, "k": key}
+        raw = json.dumps(payload, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[str, list]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_key = payload["d"], payload["k"]
+            if direction not in ("n", "p") or len(raw_key) != len(self.fields):
+                raise ValueError(cursor)
+            opts = self.queryset.model._meta
+            key = [
+                opts.get_field(field).to_python(value)
+                for field, value in zip(self.fields, raw_key)
+            ]
+            # The ordering keys are never null; None cannot be filtered on.
+            if None in key:
+                raise ValueError(cursor)
+        except (ValueError, TypeError, KeyError, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+        return direction, key
+
+    def _after(self, key, forward: bool) -> Q:
+        """Rows strictly after ``key`` in (``forward``) or against the ordering."""
+
+        condition = Q()
+        for position in reversed(range(len(self.fields))):
+            field = self.fields[position]
+            descending = self.ordering[position].startswith("-")
+            lookup = "lt" if descending == forward else "gt"
+            step = Q(**{f"{field}__{lookup}": key[position]})
+            if position < len(self.fields) - 1:
+                step |= Q(**{field: key[position]}) & condition
+            condition = step
+        return condition
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        if not cursor:
+            rows = list(self.queryset.order_by(*self.ordering)[: self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            return CursorPage(
+                rows,
+                next_cursor=self.encode_cursor(rows[-1], "n") if has_more else None,
+            )
+
+        direction, key = self.decode_cursor(cursor)
+        if direction == "n":
+            rows = list(
+                self.queryset.filter(self._after(key, forward=True)).order_by(
+                    *self.ordering
+                )[: self.per_page + 1]
+            )
+            has_more = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            return CursorPage(
+                rows,
+                next_cursor=self.encode_cursor(rows[-1], "n") if has_more else None,
+                previous_cursor=self.encode_cursor(rows[0], "p") if rows else None,
+            )
+
+        reverse_ordering = [
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        ]
+        rows = list(
+            self.queryset.filter(self._after(key, forward=False)).order_by(
+                *reverse_ordering
+            )[: self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page][::-1]
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], "n") if rows else None,
+            previous_cursor=self.encode_cursor(rows[0], "p") if has_more else None,
+        )
+
+
+class CursorPaginationMixin:
+    """Opt a ListView/FilterView into keyset pagination.
+
+    Only querysets ordered exactly by ``cursor_ordering`` are paginated with
+    cursors; anything else (relevance-ranked searches, legacy ``?page=``
+    links) keeps using Django's offset paginator.
+    """
+
+    cursor_ordering = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = tuple(queryset.query.order_by)
+        if ordering != self.cursor_ordering or self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise BadRequest("Invalid cursor.")
+        return (paginator, page, page.object_list, page.has_other_pages())
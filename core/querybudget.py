@@ -0,0 +1,86 @@
+"""
+Per-request SQL query budgets.
+
+:class:`QueryBudgetMiddleware` counts the queries and database time of every
+request through ``connection.execute_wrapper`` and logs the requests whose
+URL name has a budget in ``settings.QUERY_BUDGETS`` and went over it. The
+same counter backs ``core.testing.QueryBudgetMixin.assertMaxQueries``.
+
+Transaction control statements are not counted: whether ``atomic`` sends
+``BEGIN``/``COMMIT`` or a ``SAVEPOINT`` through the wrapper depends on the
+backend and on the transaction each test runs in, not on the view.
+"""
+
+import logging
+import re
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_SQL = re.compile(
+    r"\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE SAVEPOINT)\b", re.IGNORECASE
+)
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook tallying statements and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if TRANSACTION_SQL.match(sql):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+@contextmanager
+def count_queries():
+    """Count the queries run on every database connection inside the block."""
+
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def get_budget(url_name: str | None) -> int | None:
+    return settings.QUERY_BUDGETS.get(url_name) if url_name else None
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            # Set up front so inner middleware can read the live counter.
+            request.query_stats = counter
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        budget = get_budget(url_name)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                "Query budget exceeded for %s (%s %s): %d queries, budget %d, "
+                "%.1f ms in the database",
+                url_name,
+                request.method,
+                request.path,
+                counter.count,
+                budget,
+                counter.duration * 1000,
+            )
+        return response
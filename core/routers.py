@@ -0,0 +1,86 @@
+"""
+Primary/replica database routing.
+
+When ``settings.DATABASE_REPLICA`` names a database alias,
+:class:`ReplicaMiddleware` lets :class:`PrimaryReplicaRouter` send the reads
+of a request to that replica. Everything else uses the primary:
+
+* writes, and reads inside a transaction on the primary;
+* unsafe (POST, ...) requests, which check and write the same rows;
+* reads after a write in the same request;
+* every request from a browser that wrote within the last
+  ``REPLICA_PIN_SECONDS``, so users see their own writes even while the
+  replica lags behind. The pin is a cookie, so it costs no lookup;
+* code running outside a request, such as management commands.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "db_primary"
+
+
+class Routing:
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_routing: ContextVar[Routing | None] = ContextVar("db_routing", default=None)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if (
+            routing is None
+            or routing.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return settings.DATABASE_REPLICA
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.pinned = routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return {obj1._state.db, obj2._state.db} <= {
+            DEFAULT_DB_ALIAS,
+            settings.DATABASE_REPLICA,
+        } or None
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.DATABASE_REPLICA is None:
+            return self.get_response(request)
+
+        routing = Routing(
+            pinned=request.method not in ("GET", "HEAD", "OPTIONS")
+            or PIN_COOKIE in request.COOKIES
+        )
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if routing.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
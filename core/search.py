@@ -0,0 +1,270 @@
+"""
+Full-text search for the browse pages.
+
+Each searchable table is described by a :class:`SearchIndex`. On SQLite the
+index is an external-content FTS5 table kept in sync by triggers, on Postgres
+a generated ``tsvector`` column with a GIN index. Any other database, a
+SQLite build without FTS5 and Postgres queries made only of stopwords fall
+back to ``icontains`` matching.
+
+The backend is picked from the connection vendor unless ``SEARCH_BACKEND``
+names a backend class explicitly.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Postgres weight letters mapped to SQLite bm25() column weights.
+SQLITE_WEIGHTS = {"A": 10.0, "B": 4.0, "C": 1.0, "D": 0.5}
+
+POSTGRES_CONFIG = "english"
+
+MAX_TERMS = 8
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    fields: tuple[tuple[str, str], ...]  # (column, weight letter)
+
+    @property
+    def columns(self) -> list[str]:
+        return [column for column, _ in self.fields]
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+    @property
+    def vector_column(self) -> str:
+        return "search_vector"
+
+
+def search_terms(value: str) -> list[str]:
+    return re.findall(r"\w+", value or "")[:MAX_TERMS]
+
+
+class SubstringSearchBackend:
+    """Every term has to appear in at least one of the indexed columns."""
+
+    def condition(self, index: SearchIndex, value: str) -> Q:
+        condition = Q()
+        for term in search_terms(value):
+            matches_term = Q()
+            for column in index.columns:
+                matches_term |= Q(**{f"{column}__icontains": term})
+            condition &= matches_term
+        return condition
+
+    def search(self, queryset: QuerySet, index: SearchIndex, value: str):
+        return queryset.filter(self.condition(index, value)).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class SQLiteSearchBackend:
+    def search(self, queryset: QuerySet, index: SearchIndex, value: str):
+        connection = connections[queryset.db]
+        if not sqlite_fts_installed(connection, index):
+            return SubstringSearchBackend().search(queryset, index, value)
+
+        query = " ".join(f'"{term}"*' for term in search_terms(value))
+        qn = connection.ops.quote_name
+        fts = qn(index.fts_table)
+        weights = ", ".join(str(SQLITE_WEIGHTS[weight]) for _, weight in index.fields)
+        matches = RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [query])
+        rank = RawSQL(
+            f"SELECT -bm25({fts}, {weights}) FROM {fts} "
+            f"WHERE {fts} MATCH %s AND {fts}.rowid = {qn(index.table)}.{qn('id')}",
+            [query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+
+class PostgresSearchBackend:
+    def search(self, queryset: QuerySet, index: SearchIndex, value: str):
+        query = " & ".join(f"{term}:*" for term in search_terms(value))
+        qn = connections[queryset.db].ops.quote_name
+        vector = f"{qn(index.table)}.{qn(index.vector_column)}"
+        tsquery = f"to_tsquery('{POSTGRES_CONFIG}', %s)"
+        matches = RawSQL(f"{vector} @@ {tsquery}", [query], output_field=BooleanField())
+        # A query of stopwords only has no lexemes and would match nothing, so
+        # it falls back to substrings. The check is on a constant, which the
+        # planner folds away, leaving the index scan for real queries.
+        has_lexemes = RawSQL(
+            f"numnode({tsquery}) > 0", [query], output_field=BooleanField()
+        )
+        substrings = SubstringSearchBackend().condition(index, value)
+        rank = RawSQL(
+            f"ts_rank({vector}, {tsquery})", [query], output_field=FloatField()
+        )
+        return queryset.filter(
+            Q(has_lexemes, matches) | (~Q(has_lexemes) & substrings)
+        ).annotate(search_rank=rank)
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(alias: str = "default"):
+    backend_path = getattr(settings, "SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    vendor = connections[alias].vendor
+    return VENDOR_BACKENDS.get(vendor, SubstringSearchBackend)()
+
+
+def search(queryset: QuerySet, index: SearchIndex, value: str, rank: bool = True):
+    """Filter ``queryset`` down to rows matching ``value``.
+
+    Matching rows are annotated with ``search_rank`` (higher is better) and,
+    when ``rank`` is set, ordered by it ahead of the existing ordering.
+    """
+
+    if not search_terms(value):
+        return queryset
+    results = get_search_backend(queryset.db).search(queryset, index, value)
+    if rank:
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        results = results.order_by("-search_rank", *ordering)
+    return results
+
+
+# Installation -------------------------------------------------------------
+
+
+_installed: set[tuple[str, str]] = set()
+
+
+def sqlite_fts_installed(connection, index: SearchIndex) -> bool:
+    key = (str(connection.settings_dict["NAME"]), index.fts_table)
+    if key not in _installed:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [index.fts_table],
+            )
+            if cursor.fetchone() is None:
+                return False
+        _installed.add(key)
+    return True
+
+
+def install_sqlite_fts(connection, index: SearchIndex) -> None:
+    """Create the FTS5 table and its sync triggers if they are missing.
+
+    SQLite drops a table's triggers whenever a migration rebuilds it, so this
+    is idempotent and re-run after every migrate. The FTS table is rebuilt
+    from its content table whenever a trigger had to be recreated.
+    """
+
+    qn = connection.ops.quote_name
+    table, fts = qn(index.table), qn(index.fts_table)
+    columns = ", ".join(qn(column) for column in index.columns)
+    new_values = ", ".join(f"new.{qn(column)}" for column in index.columns)
+    old_values = ", ".join(f"old.{qn(column)}" for column in index.columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.{qn('id')}, {old_values});"
+    )
+    insert_new = (
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{qn('id')}, {new_values});"
+    )
+    triggers = {
+        f"{index.fts_table}_ai": f"AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"{index.fts_table}_ad": f"AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"{index.fts_table}_au": (
+            f"AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END"
+        ),
+    }
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{columns}, content={table}, content_rowid={qn('id')})"
+            )
+        except OperationalError:
+            # SQLite compiled without FTS5; searches use the fallback backend.
+            return
+
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+            [index.table],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in triggers if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {qn(name)} {triggers[name]}")
+        if missing:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def uninstall_sqlite_fts(connection, index: SearchIndex) -> None:
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(
+                f"DROP TRIGGER IF EXISTS {qn(f'{index.fts_table}_{suffix}')}"
+            )
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(index.fts_table)}")
+
+
+def install_postgres_search(connection, index: SearchIndex) -> None:
+    qn = connection.ops.quote_name
+    document = " || ".join(
+        f"setweight(to_tsvector('{POSTGRES_CONFIG}', "
+        f"coalesce({qn(column)}, '')), '{weight}')"
+        for column, weight in index.fields
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {qn(index.table)} ADD COLUMN IF NOT EXISTS "
+            f"{qn(index.vector_column)} tsvector "
+            f"GENERATED ALWAYS AS ({document}) STORED"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {qn(f'{index.table}_search_idx')} "
+            f"ON {qn(index.table)} USING GIN ({qn(index.vector_column)})"
+        )
+
+
+def uninstall_postgres_search(connection, index: SearchIndex) -> None:
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {qn(index.table)} "
+            f"DROP COLUMN IF EXISTS {qn(index.vector_column)}"
+        )
+
+
+def install_search_index(connection, index: SearchIndex) -> None:
+    if connection.vendor == "sqlite":
+        install_sqlite_fts(connection, index)
+    elif connection.vendor == "postgresql":
+        install_postgres_search(connection, index)
+
+
+def uninstall_search_index(connection, index: SearchIndex) -> None:
+    if connection.vendor == "sqlite":
+        uninstall_sqlite_fts(connection, index)
+    elif connection.vendor == "postgresql":
+        uninstall_postgres_search(connection, index)
+    _installed.discard((str(connection.settings_dict["NAME"]), index.fts_table))
+
+
+def repair_search_triggers(connection, index: SearchIndex) -> None:
+    """Restore SQLite sync triggers dropped by a table rebuild during migrate."""
+
+    if connection.vendor == "sqlite" and sqlite_fts_installed(connection, index):
+        install_sqlite_fts(connection, index)
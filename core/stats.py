@@ -0,0 +1,88 @@
+"""
+Marketplace headline counters shown on the home and about pages.
+
+The counts are computed in two queries and cached for
+``MARKETPLACE_STATS_TTL`` seconds; account and job writes that can change them
+retire the cached copy.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from jobs.models import Job
+from users.models import Account
+
+from .cache import Namespace
+
+STATS_CACHE = Namespace("marketplace-stats")
+
+
+def compute_marketplace_stats() -> dict[str, int]:
+    stats = Account.objects.aggregate(
+        total_students=Count("pk", filter=Q(role_level=Account.Role.STUDENT)),
+        total_tutors=Count("pk", filter=Q(role_level__gte=Account.Role.TUTOR)),
+        total_mentors=Count("pk", filter=Q(role_level__gte=Account.Role.MENTOR)),
+    )
+    stats["open_jobs"] = Job.objects.filter(status=Job.Status.OPEN).count()
+    return stats
+
+
+def get_marketplace_stats() -> dict[str, int]:
+    return STATS_CACHE.get_or_set(
+        STATS_CACHE.key("headline"),
+        compute_marketplace_stats,
+        settings.MARKETPLACE_STATS_TTL,
+    )
+
+
+def invalidate_marketplace_stats() -> None:
+    STATS_CACHE.invalidate()
+
+
+def _touches(update_fields, field: str) -> bool:
+    return update_fields is None or field in update_fields
+
+
+# Account fields whose changes may move the counts.
+STATS_ACCOUNT_FIELDS = ("role_level", "is_active")
+
+
+def _stats_fields(account) -> tuple:
+    return tuple(getattr(account, field) for field in STATS_ACCOUNT_FIELDS)
+
+
+@receiver(pre_save, sender=Account)
+def remember_account_stats_fields(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    # Account.save names every field on a full save, so update_fields alone
+    # cannot tell a profile edit from a role change.
+    instance._stats_previous = None
+    if instance.pk and not raw:
+        if any(_touches(update_fields, field) for field in STATS_ACCOUNT_FIELDS):
+            instance._stats_previous = (
+                Account.objects.filter(pk=instance.pk)
+                .values_list(*STATS_ACCOUNT_FIELDS)
+                .first()
+            )
+
+
+@receiver(post_save, sender=Account)
+def account_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_stats_previous", None)
+    if created or (previous is not None and previous != _stats_fields(instance)):
+        invalidate_marketplace_stats()
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, "status"):
+        invalidate_marketplace_stats()
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Job)
+def stats_row_deleted(sender, instance, **kwargs):
+    invalidate_marketplace_stats()
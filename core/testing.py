@@ -0,0 +1,110 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .querybudget import count_queries, get_budget
+
+
+def run_concurrently(target, arguments) -> list[Exception]:
+    """Call ``target(*args)`` for every tuple in ``arguments``, each in its own
+    thread and all released at once. Returns the exceptions raised.
+
+    Use from a ``TransactionTestCase``: each thread has its own connection.
+    """
+
+    barrier = threading.Barrier(len(arguments))
+    errors = []
+
+    def run(args):
+        try:
+            barrier.wait()
+            target(*args)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=(args,)) for args in arguments]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class QueryPlanMixin:
+    """Assertions on the execution plan the database picks for a queryset."""
+
+    def assertUsesIndex(self, queryset) -> None:
+        if connection.vendor == "postgresql":
+            # Tiny test tables always favour a sequential scan, so make the
+            # planner show whether an index is usable at all.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+            self.assertNotIn("Seq Scan", plan, msg=plan)
+        elif connection.vendor == "sqlite":
+            plan = queryset.explain()
+            for line in plan.splitlines():
+                if " SCAN " in f" {line} ":
+                    self.assertIn("INDEX", line, msg=plan)
+            # Rowid lookups are primary key index searches too.
+            self.assertRegex(plan, "INDEX|PRIMARY KEY", msg=plan)
+        else:
+            self.skipTest(f"No plan assertions for {connection.vendor}")
+
+
+class ChangelistQueryMixin:
+    """Fixed query counts for admin changelist pages.
+
+    The count covers the whole request, including the session and user
+    lookups, and must not grow with the number of rows on the page.
+    """
+
+    def assertChangelistQueries(self, model, num: int) -> None:
+        admin_user, _ = get_user_model().objects.get_or_create(
+            username="changelist-admin",
+            defaults={"is_staff": True, "is_superuser": True},
+        )
+        self.client.force_login(admin_user)
+        opts = model._meta
+        url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def assertSearchFinds(self, model, search_term: str, num: int):
+        """Check the changelist search for ``search_term`` finds ``num`` rows.
+
+        Returns the admin's search queryset, e.g. for ``assertUsesIndex``.
+        """
+
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get("/", {"q": search_term})
+        queryset, _ = model_admin.get_search_results(
+            request, model._default_manager.all(), search_term
+        )
+        self.assertEqual(queryset.count(), num)
+        return queryset
+
+
+class QueryBudgetMixin:
+    """Hold views to the query budgets declared in ``settings.QUERY_BUDGETS``."""
+
+    @contextmanager
+    def assertMaxQueries(self, view_name: str):
+        budget = get_budget(view_name)
+        if budget is None:
+            self.fail(f"No query budget declared for {view_name!r}")
+        with count_queries() as counter:
+            yield counter
+        self.assertLessEqual(
+            counter.count,
+            budget,
+            msg=f"{view_name} ran {counter.count} queries, budget is {budget}",
+        )
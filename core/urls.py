@@ -1,9 +1,9 @@
-from debug_toolbar.toolbar import debug_toolbar_urls  # type: ignore
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.metrics import metrics_view
 from home.views import (
     AboutView,
     ContactView,
@@ -11,6 +11,7 @@ from home.views import (
     HomeView,
     UpdateTestimonialView,
 )
+from jobs.api import JobAPIView
 from jobs.views import (
     AcceptOfferView,
     JobCreateView,
@@ -19,7 +20,9 @@ from jobs.views import (
     JobListView,
     SubmitOfferView,
 )
+from listings.api import ListingAPIView, MentorAPIView
 from listings.views import (
+    BookingExportView,
     CreateBookingView,
     CreateMentorListingView,
     CreateReviewView,
@@ -36,11 +39,13 @@ from listings.views import (
     StudentBookingsView,
     UpdateBookingStatusView,
     get_available_slots,
+    tile_cache_stats,
 )
 from subscriptions.views import ChangePlanView, PricingView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("", HomeView.as_view(), name="home"),
     path("about/", AboutView.as_view(), name="about"),
     path(
@@ -62,6 +67,11 @@ urlpatterns = [
         CreateTutorListingView.as_view(),
         name="create-listing",
     ),
+    path(
+        "listings/tile-cache-stats/",
+        tile_cache_stats,
+        name="listing-tile-cache-stats",
+    ),
     path(
         "listings/<int:pk>/",
         ListingDetailView.as_view(),
@@ -83,6 +93,16 @@ urlpatterns = [
         name="delete-availability",
     ),
     path("bookings/", MyBookingsView.as_view(), name="my-bookings"),
+    path(
+        "bookings/export/",
+        BookingExportView.as_view(scope="tutor"),
+        name="my-bookings-export",
+    ),
+    path(
+        "bookings/export/all/",
+        BookingExportView.as_view(scope="all"),
+        name="booking-export-all",
+    ),
     path(
         "bookings/<int:booking_id>/status/<str:status>/",
         UpdateBookingStatusView.as_view(),
@@ -99,6 +119,11 @@ urlpatterns = [
         name="available-slots",
     ),
     path("my-lessons/", StudentBookingsView.as_view(), name="student-bookings"),
+    path(
+        "my-lessons/export/",
+        BookingExportView.as_view(scope="student"),
+        name="student-bookings-export",
+    ),
     path(
         "bookings/<int:booking_id>/review/",
         CreateReviewView.as_view(),
@@ -136,8 +161,15 @@ urlpatterns = [
         ChangePlanView.as_view(),
         name="change-plan",
     ),
+    path("api/v1/listings/", ListingAPIView.as_view(), name="api-v1-listings"),
+    path("api/v1/mentors/", MentorAPIView.as_view(), name="api-v1-mentors"),
+    path("api/v1/jobs/", JobAPIView.as_view(), name="api-v1-jobs"),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+if settings.DEBUG_TOOLBAR:
+    from debug_toolbar.toolbar import debug_toolbar_urls  # type: ignore
+
     urlpatterns += debug_toolbar_urls()
@@ -0,0 +1,220 @@
+import importlib.util
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import Namespace, registry
+from core.metrics import Histograms, ServerTimingMiddleware, check_metrics_cache
+from core.stats import compute_marketplace_stats, get_marketplace_stats
+from jobs.models import Job
+from users.models import Account
+
+
+class ServerTimingTests(TestCase):
+    def test_hidden_from_anonymous_clients(self):
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_shown_to_staff(self):
+        self.client.force_login(Account.objects.create_user("staff", is_staff=True))
+        response = self.client.get(reverse("home"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    @override_settings(SERVER_TIMING_PUBLIC=True)
+    def test_shown_to_everyone_when_public(self):
+        self.assertIn("Server-Timing", self.client.get(reverse("home")))
+
+
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+    }
+}
+
+
+@override_settings(TESTING=False, DEBUG=False)
+class MetricsCacheTests(SimpleTestCase):
+    def test_warns_on_cache_private_to_one_process(self):
+        self.assertEqual(
+            [warning.id for warning in check_metrics_cache(None)], ["core.W001"]
+        )
+        # The site itself still starts.
+        ServerTimingMiddleware(HttpResponse)
+
+    @override_settings(METRICS_SINGLE_PROCESS=True)
+    def test_single_process_may_use_any_cache(self):
+        self.assertEqual(check_metrics_cache(None), [])
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_accepts_shared_cache(self):
+        self.assertEqual(check_metrics_cache(None), [])
+
+    def test_unshared_cache_keeps_totals_in_process(self):
+        store = Histograms()
+        with mock.patch.object(store, "_increment") as increment:
+            store.observe("home", 0.02, 0.01, 0.005, 3)
+            store.observe("home", 0.02, 0.01, 0.005, 2)
+            snapshot = store.snapshot()
+        increment.assert_not_called()
+        self.assertEqual(snapshot["home"]["count"], 2)
+        self.assertEqual(snapshot["home"]["queries"], 5)
+
+    @override_settings(CACHES=REDIS_CACHES, METRICS_FLUSH_INTERVAL=0)
+    def test_redis_flush_is_one_pipeline(self):
+        client = mock.MagicMock()
+        pipeline = client.get_client.return_value.pipeline.return_value
+        client.get.return_value = ["home"]
+        with mock.patch.object(RedisCache, "_cache", client, create=True):
+            Histograms().observe("home", 0.02, 0.01, 0.005, 3)
+        self.assertEqual(pipeline.execute.call_count, 1)
+        # count, sum, db, template, queries and one bucket.
+        self.assertEqual(pipeline.incrby.call_count, 6)
+        client.incr.assert_not_called()
+
+
+class MarketplaceStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Account.objects.create_user("student")
+        Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        Account.objects.create_user("mentor", role_level=Account.Role.MENTOR)
+        for status in (Job.Status.OPEN, Job.Status.OPEN, Job.Status.CLOSED):
+            Job.objects.create(
+                user=cls.student, title="Essay", description="d", status=status
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts(self):
+        with self.assertNumQueries(2):
+            stats = compute_marketplace_stats()
+        self.assertEqual(
+            stats,
+            {
+                "total_students": 1,
+                "total_tutors": 2,
+                "total_mentors": 1,
+                "open_jobs": 2,
+            },
+        )
+
+    def test_profile_edit_keeps_cached_stats(self):
+        get_marketplace_stats()
+        self.student.first_name = "Ada"
+        self.student.save()
+        with self.assertNumQueries(0):
+            get_marketplace_stats()
+
+    def test_role_and_active_changes_retire_cached_stats(self):
+        get_marketplace_stats()
+        self.student.role_level = Account.Role.TUTOR
+        self.student.save()
+        self.assertEqual(get_marketplace_stats()["total_tutors"], 3)
+
+        self.student.is_active = False
+        self.student.save(update_fields=["is_active"])
+        with self.assertNumQueries(2):
+            get_marketplace_stats()
+
+    def test_job_status_change_retires_cached_stats(self):
+        get_marketplace_stats()
+        job = Job.objects.filter(status=Job.Status.OPEN).first()
+        job.status = Job.Status.CLOSED
+        job.save()
+        self.assertEqual(get_marketplace_stats()["open_jobs"], 1)
+
+
+@override_settings(CACHE_LOCK_TIMEOUT=0.05, CACHE_LOCK_POLL_INTERVAL=0.01)
+class NamespaceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.namespace = Namespace("test")
+        self.addCleanup(registry.pop, "test")
+
+    def test_scope_and_namespace_invalidation(self):
+        tutor1 = self.namespace.key("tile", 1, depends_on=[("tutor", 1)])
+        tutor2 = self.namespace.key("tile", 2, depends_on=[("tutor", 2)])
+        self.namespace.set(tutor1, "one")
+        self.namespace.set(tutor2, "two")
+
+        self.namespace.invalidate("tutor", 1)
+        self.assertNotEqual(
+            self.namespace.key("tile", 1, depends_on=[("tutor", 1)]), tutor1
+        )
+        self.assertEqual(
+            self.namespace.key("tile", 2, depends_on=[("tutor", 2)]), tutor2
+        )
+        self.assertEqual(self.namespace.get(tutor2), "two")
+
+        self.namespace.invalidate()
+        self.assertNotEqual(
+            self.namespace.key("tile", 2, depends_on=[("tutor", 2)]), tutor2
+        )
+
+    def test_get_or_set_computes_once(self):
+        compute = mock.Mock(return_value=42)
+        key = self.namespace.key("answer")
+        self.assertEqual(self.namespace.get_or_set(key, compute), 42)
+        self.assertEqual(self.namespace.get_or_set(key, compute), 42)
+        compute.assert_called_once()
+        self.assertIsNone(cache.get(f"lock:{key}"))
+
+    def test_get_or_set_waits_for_the_lock_holder(self):
+        key = self.namespace.key("answer")
+        cache.add(f"lock:{key}", 1)
+        compute = mock.Mock(return_value="mine")
+
+        def other_process_finishes(seconds):
+            cache.set(key, "theirs")
+
+        with mock.patch("core.cache.time.sleep", side_effect=other_process_finishes):
+            self.assertEqual(self.namespace.get_or_set(key, compute), "theirs")
+        compute.assert_not_called()
+
+    def test_get_or_set_computes_after_the_lock_times_out(self):
+        key = self.namespace.key("answer")
+        cache.add(f"lock:{key}", 1)
+        self.assertEqual(self.namespace.get_or_set(key, lambda: "mine"), "mine")
+        # The lock belongs to the other process and is left alone.
+        self.assertEqual(cache.get(f"lock:{key}"), 1)
+
+    def test_hit_and_miss_counters(self):
+        key = self.namespace.key("value")
+        self.namespace.get(key)
+        self.namespace.set(key, 1)
+        self.namespace.get(key)
+        self.namespace.get_many([key, self.namespace.key("other")])
+        self.assertEqual(
+            self.namespace.stats(), {"hits": 2, "misses": 2, "hit_rate": 0.5}
+        )
+
+        self.namespace.reset_stats()
+        self.assertEqual(
+            self.namespace.stats(), {"hits": 0, "misses": 0, "hit_rate": None}
+        )
+
+
+class SettingsGuardTests(SimpleTestCase):
+    def load_settings(self, **environ):
+        path = os.path.join(settings.BASE_DIR, "core", "settings.py")
+        spec = importlib.util.spec_from_file_location("core.settings_probe", path)
+        with mock.patch.dict(os.environ, environ):
+            spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+    def test_debug_toolbar_refused_without_debug(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "DEBUG_TOOLBAR"):
+            self.load_settings(DEBUG="False", DEBUG_TOOLBAR="True")
+
+    def test_debug_toolbar_allowed_with_debug(self):
+        self.load_settings(DEBUG="True", DEBUG_TOOLBAR="True")
+        self.load_settings(DEBUG="False", DEBUG_TOOLBAR="False")
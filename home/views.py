@@ -4,11 +4,10 @@ from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, FormView, TemplateView
 
+from core.stats import get_marketplace_stats
 from home.forms import ContactForm, TestimonialForm
 from home.models import Testimonial
-from jobs.models import Job
 from listings.models import Listing
-from users.models import Account
 
 
 class HomeView(TemplateView):
@@ -16,18 +15,8 @@ class HomeView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["listings"] = Listing.objects.select_related("user").order_by("id")[:3]
-
-        context["total_students"] = Account.objects.filter(
-            role_level=Account.Role.STUDENT
-        ).count()
-        context["total_tutors"] = Account.objects.filter(
-            role_level__gte=Account.Role.TUTOR
-        ).count()
-        context["total_mentors"] = Account.objects.filter(
-            role_level__gte=Account.Role.MENTOR
-        ).count()
-        context["open_jobs"] = Job.objects.filter(status=Job.Status.OPEN).count()
+        context["listings"] = Listing.objects.with_tutor_stats().order_by("id")[:3]
+        context.update(get_marketplace_stats())
 
         return context
 
@@ -37,18 +26,8 @@ class AboutView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["listings"] = Listing.objects.select_related("user").order_by("id")[:3]
-
-        context["total_students"] = Account.objects.filter(
-            role_level=Account.Role.STUDENT
-        ).count()
-        context["total_tutors"] = Account.objects.filter(
-            role_level__gte=Account.Role.TUTOR
-        ).count()
-        context["total_mentors"] = Account.objects.filter(
-            role_level__gte=Account.Role.MENTOR
-        ).count()
-        context["open_jobs"] = Job.objects.filter(status=Job.Status.OPEN).count()
+        context["listings"] = Listing.objects.with_tutor_stats().order_by("id")[:3]
+        context.update(get_marketplace_stats())
 
         context["testimonials"] = Testimonial.objects.filter(
             is_approved=True
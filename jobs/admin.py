@@ -1,16 +1,36 @@
 from django.contrib import admin
 
-from .models import Job, Proposal
+from core.search import search
+from users.admin import AccountSearchMixin
+
+from .models import JOB_SEARCH_INDEX, Job, Proposal
 
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "user", "status", "created_at")
     list_filter = ("status",)
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    show_full_result_count = False
+    # Matched through the full-text index, see get_search_results.
     search_fields = ("title", "description")
 
+    def get_search_results(self, request, queryset, search_term):
+        return search(queryset, JOB_SEARCH_INDEX, search_term, rank=False), False
+
 
 @admin.register(Proposal)
-class ProposalAdmin(admin.ModelAdmin):
+class ProposalAdmin(AccountSearchMixin, admin.ModelAdmin):
     list_display = ("id", "job", "user", "price", "is_accepted", "created_at")
     list_filter = ("is_accepted",)
+    list_select_related = ("job", "user")
+    autocomplete_fields = ("job", "user")
+    show_full_result_count = False
+    account_search_fields = ("user",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Numbers are job ids, matched through the job index.
+        if search_term.strip().isdigit():
+            return queryset.filter(job_id=search_term.strip()), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,31 @@
+from core.api import ValuesAPIView
+
+from .filters import JobFilter
+from .models import Job
+
+
+class JobAPIView(ValuesAPIView):
+    model = Job
+    filterset_class = JobFilter
+    api_fields = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "subject": "subject",
+        "budget": "budget",
+        "status": "status",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "client_id": "user_id",
+        "client": "user__username",
+    }
+    default_fields = (
+        "id",
+        "title",
+        "subject",
+        "budget",
+        "status",
+        "created_at",
+        "client_id",
+        "client",
+    )
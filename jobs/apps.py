@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_job_search(sender, using, **kwargs):
+    from django.db import connections
+
+    from core.search import repair_search_triggers
+
+    from .models import JOB_SEARCH_INDEX
+
+    repair_search_triggers(connections[using], JOB_SEARCH_INDEX)
 
 
 class JobsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "jobs"
+
+    def ready(self):
+        post_migrate.connect(repair_job_search, sender=self)
@@ -1,7 +1,8 @@
 import django_filters
-from django.db import models
 
-from .models import Job
+from core.search import search
+
+from .models import JOB_SEARCH_INDEX, Job
 
 
 class JobFilter(django_filters.FilterSet):
@@ -13,10 +14,4 @@ class JobFilter(django_filters.FilterSet):
         fields = ["status"]
 
     def filter_search(self, queryset, name, value):
-        if value:
-            queryset = queryset.filter(
-                models.Q(title__icontains=value)
-                | models.Q(description__icontains=value)
-                | models.Q(subject__icontains=value)
-            )
-        return queryset
+        return search(queryset, JOB_SEARCH_INDEX, value)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0003_remove_job_mode"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "-created_at"], name="job_status_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from core.search import SearchIndex, install_search_index, uninstall_search_index
+
+JOB_SEARCH_INDEX = SearchIndex(
+    "jobs_job", (("title", "A"), ("subject", "B"), ("description", "C"))
+)
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection, JOB_SEARCH_INDEX)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection, JOB_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0004_job_job_status_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
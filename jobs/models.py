@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from core.search import SearchIndex
+
 
 class Job(models.Model):
     class Status(models.TextChoices):
@@ -21,14 +23,25 @@ class Job(models.Model):
         max_length=20, choices=Status.choices, default=Status.OPEN
     )
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "-created_at"], name="job_status_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+JOB_SEARCH_INDEX = SearchIndex(
+    Job._meta.db_table, (("title", "A"), ("subject", "B"), ("description", "C"))
+)
+
+
 class Proposal(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="proposals")
     user = models.ForeignKey(
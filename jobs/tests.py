@@ -1 +1,119 @@
-# Create your tests here.
+from django.test import TestCase
+from django.urls import reverse
+
+from core.search import search
+from core.testing import ChangelistQueryMixin, QueryPlanMixin
+from users.models import Account
+
+from .models import JOB_SEARCH_INDEX, Job, Proposal
+
+
+class HotQueryIndexTests(QueryPlanMixin, TestCase):
+    def test_open_jobs_browse_uses_index(self):
+        self.assertUsesIndex(
+            Job.objects.filter(status=Job.Status.OPEN).order_by("-created_at")
+        )
+
+
+class AdminChangelistQueryTests(ChangelistQueryMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            client = Account.objects.create_user(f"client{i}")
+            freelancer = Account.objects.create_user(
+                f"freelancer{i}", role_level=Account.Role.FREELANCER
+            )
+            job = Job.objects.create(user=client, title=f"Job {i}", description="Help")
+            Proposal.objects.create(job=job, user=freelancer, price=50)
+
+    def test_job_changelist(self):
+        self.assertChangelistQueries(Job, 4)
+
+    def test_proposal_changelist(self):
+        self.assertChangelistQueries(Proposal, 4)
+
+
+class JobSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = Account.objects.create_user("client")
+        cls.in_title, cls.in_description = (
+            Job.objects.create(user=cls.client_user, title=title, description=text)
+            for title, text in (
+                ("Django developer", "Build a booking site"),
+                ("Website fixes", "Small Django and CSS changes"),
+            )
+        )
+
+    def search(self, value):
+        return list(search(Job.objects.order_by("pk"), JOB_SEARCH_INDEX, value))
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search("django"), [self.in_title, self.in_description])
+        response = self.client.get(reverse("jobs"), {"q": "django"})
+        self.assertEqual(
+            list(response.context["jobs"]), [self.in_title, self.in_description]
+        )
+
+    def test_follows_edits_and_deletes(self):
+        self.in_description.description = "Small CSS changes"
+        self.in_description.save()
+        self.assertEqual(self.search("django"), [self.in_title])
+        self.in_title.delete()
+        self.assertEqual(self.search("django"), [])
+
+
+class JobAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Account.objects.create_user("client")
+        for status in (Job.Status.OPEN, Job.Status.CLOSED, Job.Status.OPEN):
+            Job.objects.create(
+                user=client, title=f"{status} job", description="Help", status=status
+            )
+
+    def test_filter_and_projection(self):
+        response = self.client.get(
+            reverse("api-v1-jobs"), {"status": "open", "fields": "status,client"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"status": "open", "client": "client"}] * 2,
+        )
+
+    def test_invalid_filter(self):
+        response = self.client.get(reverse("api-v1-jobs"), {"status": "bogus"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.json()["errors"])
+
+
+class JobDetailConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = Account.objects.create_user("client")
+        cls.job = Job.objects.create(
+            user=cls.client_user, title="Essay", description="d"
+        )
+        cls.url = reverse("job-detail", args=[cls.job.pk])
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        for headers in (
+            {"if-none-match": response["ETag"]},
+            {"if-modified-since": response["Last-Modified"]},
+        ):
+            with self.subTest(headers=headers):
+                cached = self.client.get(self.url, headers=headers)
+                self.assertEqual(cached.status_code, 304)
+
+    def test_new_proposal_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        freelancer = Account.objects.create_user(
+            "freelancer", role_level=Account.Role.FREELANCER
+        )
+        Proposal.objects.create(job=self.job, user=freelancer, price=50)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
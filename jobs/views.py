@@ -1,17 +1,23 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView
 from django_filters.views import FilterView
 
+from core.conditional import Freshness, conditional_page, latest
+from core.pagination import CursorPaginationMixin
+
 from .filters import JobFilter
 from .forms import JobForm, ProposalForm
 from .models import Job, Proposal
 
 
-class JobListView(FilterView):
+class JobListView(CursorPaginationMixin, FilterView):
     template_name = "job-list.html"
     model = Job
     context_object_name = "jobs"
@@ -19,7 +25,9 @@ class JobListView(FilterView):
     filterset_class = JobFilter
 
     def get_queryset(self):
-        return super().get_queryset().select_related("user").order_by("-created_at")
+        return (
+            super().get_queryset().select_related("user").order_by("-created_at", "-id")
+        )
 
 
 class JobCreateView(LoginRequiredMixin, CreateView):
@@ -33,6 +41,36 @@ class JobCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+def job_freshness(request, pk):
+    """Timestamps of a job, its owner and the proposals shown on the page."""
+
+    state = (
+        Job.objects.filter(pk=pk)
+        .annotate(
+            proposal_count=Count("proposals"),
+            proposal_users_updated_at=Max("proposals__user__updated_at"),
+        )
+        .values(
+            "updated_at",
+            "user__updated_at",
+            "proposal_count",
+            "proposal_users_updated_at",
+        )
+        .first()
+    )
+    if state is None:
+        return None
+    return Freshness(
+        state.values(),
+        latest(
+            state["updated_at"],
+            state["user__updated_at"],
+            state["proposal_users_updated_at"],
+        ),
+    )
+
+
+@method_decorator(conditional_page(job_freshness), name="get")
 class JobDetailView(DetailView):
     model = Job
     template_name = "job-detail.html"
@@ -78,6 +116,8 @@ class SubmitOfferView(LoginRequiredMixin, View):
             Proposal.objects.update_or_create(
                 job=job, user=request.user, defaults=form.cleaned_data
             )
+            # Proposals are part of the job page; let its validators change.
+            Job.objects.filter(pk=job.pk).update(updated_at=timezone.now())
             messages.success(request, "Offer submitted.")
             return redirect("jobs")
 
@@ -95,7 +135,7 @@ class AcceptOfferView(LoginRequiredMixin, View):
         prop.is_accepted = True
         prop.save(update_fields=["is_accepted"])
         job.status = Job.Status.IN_PROGRESS
-        job.save(update_fields=["status"])
+        job.save(update_fields=["status", "updated_at"])
         messages.success(request, "Offer accepted.")
         return redirect("jobs")
 
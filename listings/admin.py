@@ -1,24 +1,38 @@
 from django.contrib import admin
 
-from .models import Availability, Booking, Listing, Review
+from core.search import search
+from users.admin import AccountSearchMixin
+
+from . import exports
+from .models import LISTING_SEARCH_INDEX, Availability, Booking, Listing, Review
 
 
 @admin.register(Listing)
 class ListingAdmin(admin.ModelAdmin):
     list_display = ("id", "type", "title", "user", "price", "is_active", "created_at")
     list_filter = ("type", "is_active")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    show_full_result_count = False
+    # Matched through the full-text index, see get_search_results.
     search_fields = ("title", "description", "subject")
 
+    def get_search_results(self, request, queryset, search_term):
+        return search(queryset, LISTING_SEARCH_INDEX, search_term, rank=False), False
+
 
 @admin.register(Availability)
-class AvailabilityAdmin(admin.ModelAdmin):
+class AvailabilityAdmin(AccountSearchMixin, admin.ModelAdmin):
     list_display = ("id", "user", "day_of_week", "start_time", "end_time", "is_active")
     list_filter = ("day_of_week", "is_active")
-    search_fields = ("user__username",)
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    show_full_result_count = False
+    account_search_fields = ("user",)
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(AccountSearchMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "listing",
@@ -30,11 +44,29 @@ class BookingAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("status", "date")
-    search_fields = ("listing__title", "student__username")
+    list_select_related = ("listing", "student")
+    autocomplete_fields = ("listing", "student")
+    show_full_result_count = False
+    account_search_fields = ("student", "tutor")
+    actions = ("export_csv", "export_ndjson")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Numbers are booking ids, matched through the primary key.
+        if search_term.strip().isdigit():
+            return queryset.filter(pk=search_term.strip()), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description="Export selected bookings as CSV")
+    def export_csv(self, request, queryset):
+        return exports.export_bookings(queryset, "csv")
+
+    @admin.action(description="Export selected bookings as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return exports.export_bookings(queryset, "ndjson")
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(AccountSearchMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "reviewer",
@@ -45,5 +77,15 @@ class ReviewAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("rating", "created_at")
-    search_fields = ("reviewer__username", "reviewed_user__username", "comment")
+    list_select_related = (
+        "reviewer",
+        "reviewed_user",
+        "booking__listing",
+        "booking__student",
+        "job",
+    )
+    autocomplete_fields = ("reviewer", "reviewed_user")
+    raw_id_fields = ("booking", "job")
+    show_full_result_count = False
+    account_search_fields = ("reviewer", "reviewed_user")
     readonly_fields = ("created_at", "updated_at")
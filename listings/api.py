@@ -0,0 +1,46 @@
+from core.api import ValuesAPIView
+
+from .filters import ListingFilter
+from .models import Listing
+
+
+class ListingAPIView(ValuesAPIView):
+    model = Listing
+    filterset_class = ListingFilter
+    listing_type = Listing.ListingType.TUTOR
+    api_fields = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "subject": "subject",
+        "category": "category",
+        "price": "price",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "tutor_id": "user_id",
+        "tutor": "user__username",
+        "tutor_rating": "tutor_rating",
+        "tutor_review_count": "tutor_review_count",
+        "tutor_completed_lessons": "tutor_completed_lessons",
+    }
+    default_fields = (
+        "id",
+        "title",
+        "subject",
+        "category",
+        "price",
+        "created_at",
+        "tutor_id",
+        "tutor",
+        "tutor_rating",
+        "tutor_review_count",
+    )
+
+    def get_queryset(self):
+        return Listing.objects.with_tutor_stats().filter(
+            type=self.listing_type, is_active=True
+        )
+
+
+class MentorAPIView(ListingAPIView):
+    listing_type = Listing.ListingType.MENTOR
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_listing_search(sender, using, **kwargs):
+    from django.db import connections
+
+    from core.search import repair_search_triggers
+
+    from .models import LISTING_SEARCH_INDEX
+
+    repair_search_triggers(connections[using], LISTING_SEARCH_INDEX)
 
 
 class ListingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "listings"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(repair_listing_search, sender=self)
@@ -0,0 +1,356 @@
+"""
+Slot availability engine.
+
+Availability windows and bookings are reduced to sorted, merged lists of
+``(start, end)`` minute offsets from midnight, and the bookable one-hour slots
+are produced with a single forward sweep over both lists.
+"""
+
+import calendar
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, NamedTuple
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from users import reputation
+from users.models import Account
+
+from .models import Booking, Listing
+
+SLOT_MINUTES = 60
+BOOKING_LEAD_TIME = timedelta(minutes=10)
+
+# Used when the tutor has not declared any availability for a weekday.
+DEFAULT_WINDOW = (time(6, 0), time(23, 0))
+
+ACTIVE_BOOKING_STATUSES = (Booking.Status.PENDING, Booking.Status.CONFIRMED)
+
+# Postgres exclusion constraint rejecting overlapping active bookings of a
+# tutor, see migration 0015.
+OVERLAP_CONSTRAINT = "booking_tutor_no_overlap"
+
+Interval = tuple[int, int]
+
+
+class SlotTaken(Exception):
+    """The requested time overlaps an active booking."""
+
+
+class Slot(NamedTuple):
+    start: time
+    is_available: bool
+
+    @property
+    def value(self) -> str:
+        return self.start.strftime("%H:%M")
+
+    @property
+    def display(self) -> str:
+        hour, minute = self.start.hour, self.start.minute
+        return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+    def as_dict(self) -> dict:
+        return {
+            "value": self.value,
+            "display": self.display,
+            "is_available": self.is_available,
+        }
+
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(value: int) -> time:
+    return time(value // 60, value % 60)
+
+
+def merge_intervals(pairs: Iterable[tuple[time, time]]) -> list[Interval]:
+    """Sort ``(start, end)`` time pairs and merge the overlapping ones."""
+
+    intervals = sorted(
+        (to_minutes(start), to_minutes(end)) for start, end in pairs if start < end
+    )
+    merged: list[Interval] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def booking_cutoff() -> datetime:
+    """Earliest local datetime a new booking may start at."""
+
+    return timezone.localtime(timezone.now()) + BOOKING_LEAD_TIME
+
+
+def cutoff_minutes(day: date, cutoff: datetime | None) -> int | None:
+    """Translate ``cutoff`` into a minute offset on ``day``.
+
+    Returns ``None`` when every slot of the day is before the cutoff.
+    """
+
+    if cutoff is None:
+        return 0
+    cutoff_day = cutoff.date()
+    if cutoff_day < day:
+        return 0
+    if cutoff_day > day:
+        return None
+    minutes = cutoff.hour * 60 + cutoff.minute
+    if cutoff.second or cutoff.microsecond:
+        minutes += 1
+    return minutes
+
+
+def compute_slots(
+    day: date,
+    windows: Iterable[tuple[time, time]],
+    bookings: Iterable[tuple[time, time]],
+    cutoff: datetime | None = None,
+) -> list[Slot]:
+    """Return the hourly slots of ``day`` and whether each one is still free.
+
+    Slots start at the beginning of each (merged) availability window and are
+    generated hourly while they start inside it. Slots starting before
+    ``cutoff`` are omitted.
+    """
+
+    not_before = cutoff_minutes(day, cutoff)
+    if not_before is None:
+        return []
+
+    busy = merge_intervals(bookings)
+    slots = []
+    position = 0
+
+    for window_start, window_end in merge_intervals(windows):
+        start = window_start
+        while start < window_end:
+            if start >= not_before:
+                end = start + SLOT_MINUTES
+                while position < len(busy) and busy[position][1] <= start:
+                    position += 1
+                is_available = position == len(busy) or busy[position][0] >= end
+                slots.append(Slot(from_minutes(start), is_available))
+            start += SLOT_MINUTES
+
+    return slots
+
+
+def get_day_windows(listing: Listing, day: date) -> list[tuple[time, time]]:
+    """Active availability windows of the listing's tutor for ``day``."""
+
+    windows = list(
+        listing.user.availabilities.filter(day_of_week=day.weekday(), is_active=True)
+        .order_by()
+        .values_list("start_time", "end_time")
+    )
+    return windows or [DEFAULT_WINDOW]
+
+
+def get_day_bookings(listing: Listing, day: date) -> list[tuple[time, time]]:
+    """Time ranges the listing's tutor is already booked for on ``day``.
+
+    These are the pending and confirmed bookings of all the tutor's listings.
+    """
+
+    return list(
+        Booking.objects.filter(
+            tutor_id=listing.user_id, date=day, status__in=ACTIVE_BOOKING_STATUSES
+        )
+        .order_by()
+        .values_list("start_time", "end_time")
+    )
+
+
+def overlapping_bookings(tutor_id: int, day: date, start: time, end: time):
+    """Active bookings of the tutor overlapping ``start``-``end`` on ``day``."""
+
+    return Booking.objects.filter(
+        tutor_id=tutor_id,
+        date=day,
+        status__in=ACTIVE_BOOKING_STATUSES,
+        start_time__lt=end,
+        end_time__gt=start,
+    )
+
+
+def _lock_tutor(tutor_id: int) -> None:
+    # SQLite has no row locks; there the write lock every transaction starts
+    # with serializes writers instead.
+    if connection.features.has_select_for_update:
+        list(Account.objects.select_for_update().filter(pk=tutor_id).values_list("pk"))
+
+
+def _save_if_free(booking: Booking) -> None:
+    """Save the active ``booking`` unless its tutor is busy; raise SlotTaken if so.
+
+    Writes to the bookings of one tutor are serialized by locking the tutor,
+    so the overlap check cannot race with another booking's write.
+    """
+
+    try:
+        with transaction.atomic():
+            _lock_tutor(booking.tutor_id)
+            if (
+                overlapping_bookings(
+                    booking.tutor_id,
+                    booking.date,
+                    booking.start_time,
+                    booking.end_time,
+                )
+                .exclude(pk=booking.pk)
+                .exists()
+            ):
+                raise SlotTaken
+            booking.save()
+    except IntegrityError as exc:
+        if OVERLAP_CONSTRAINT in str(exc):
+            raise SlotTaken from exc
+        raise
+
+
+def create_booking(booking: Booking) -> None:
+    """Save a new ``booking`` unless its tutor is busy; raise SlotTaken if so."""
+
+    booking.tutor_id = booking.listing.user_id
+    _save_if_free(booking)
+
+
+def set_booking_status(booking: Booking, status: str) -> None:
+    """Move ``booking`` to ``status`` and save it.
+
+    Moves into an active status are checked like new bookings: a cancelled
+    booking may have lost its slot in the meantime, raising SlotTaken.
+    """
+
+    booking.status = status
+    if status in ACTIVE_BOOKING_STATUSES:
+        _save_if_free(booking)
+    else:
+        booking.save()
+
+
+def owner_change_conflicts(listing: Listing):
+    """Active bookings of ``listing`` clashing with its owner's other bookings.
+
+    Non-empty when ``listing.user`` has been changed to a tutor who is already
+    booked elsewhere at the time of one of the listing's bookings.
+    """
+
+    busy = Booking.objects.filter(
+        tutor_id=listing.user_id,
+        date=OuterRef("date"),
+        status__in=ACTIVE_BOOKING_STATUSES,
+        start_time__lt=OuterRef("end_time"),
+        end_time__gt=OuterRef("start_time"),
+    ).exclude(listing_id=listing.pk)
+    return listing.bookings.filter(status__in=ACTIVE_BOOKING_STATUSES).filter(
+        Exists(busy)
+    )
+
+
+@contextmanager
+def owner_change(listing: Listing):
+    """Wrap the save of ``listing`` to hand its bookings over to a new owner.
+
+    The save and the move of the bookings share one transaction, holding the
+    locks of the listing and of its new owner, so either both happen or
+    neither does. Raises SlotTaken, saving nothing, when the new owner is
+    already booked at the time of one of the bookings. The reputation counters
+    and tiles of both tutors are updated.
+    """
+
+    completed = 0
+    try:
+        with transaction.atomic():
+            previous_tutor_id = (
+                Listing.objects.select_for_update()
+                .filter(pk=listing.pk)
+                .values_list("user_id", flat=True)
+                .first()
+            )
+            moving = previous_tutor_id not in (None, listing.user_id)
+            if moving:
+                _lock_tutor(listing.user_id)
+                if owner_change_conflicts(listing).exists():
+                    raise SlotTaken
+            yield
+            if moving:
+                bookings = listing.bookings.all()
+                # updated_at is bumped for the slot lookup validators.
+                bookings.update(tutor_id=listing.user_id, updated_at=timezone.now())
+                completed = bookings.filter(status=Booking.Status.COMPLETED).count()
+                reputation.adjust_completed_lessons(previous_tutor_id, -completed)
+                reputation.adjust_completed_lessons(listing.user_id, completed)
+    except IntegrityError as exc:
+        if OVERLAP_CONSTRAINT in str(exc):
+            raise SlotTaken from exc
+        raise
+
+    if completed:
+        Listing.invalidate_tutor_tiles(previous_tutor_id)
+        Listing.invalidate_tutor_tiles(listing.user_id)
+
+
+def get_available_slots(
+    listing: Listing, day: date, cutoff: datetime | None = None
+) -> list[Slot]:
+    return compute_slots(
+        day, get_day_windows(listing, day), get_day_bookings(listing, day), cutoff
+    )
+
+
+def get_month_slots(
+    listing: Listing,
+    year: int,
+    month: int,
+    cutoff: datetime | None = None,
+    start: date | None = None,
+) -> dict[date, list[Slot]]:
+    """Compute the slots of every day in a month with two queries.
+
+    The tutor's weekly availability and the month's active bookings across
+    all the tutor's listings are each fetched once and grouped per weekday
+    and day in memory. Days before ``start`` are left out.
+    """
+
+    _, num_days = calendar.monthrange(year, month)
+    first, last = date(year, month, 1), date(year, month, num_days)
+
+    windows_by_weekday = defaultdict(list)
+    for day_of_week, start_time, end_time in (
+        listing.user.availabilities.filter(is_active=True)
+        .order_by()
+        .values_list("day_of_week", "start_time", "end_time")
+    ):
+        windows_by_weekday[day_of_week].append((start_time, end_time))
+
+    bookings_by_day = defaultdict(list)
+    for day, start_time, end_time in (
+        Booking.objects.filter(
+            tutor_id=listing.user_id,
+            date__range=(first, last),
+            status__in=ACTIVE_BOOKING_STATUSES,
+        )
+        .order_by()
+        .values_list("date", "start_time", "end_time")
+    ):
+        bookings_by_day[day].append((start_time, end_time))
+
+    month_slots = {}
+    for offset in range(num_days):
+        day = first + timedelta(days=offset)
+        if start and day < start:
+            continue
+        windows = windows_by_weekday.get(day.weekday()) or [DEFAULT_WINDOW]
+        month_slots[day] = compute_slots(day, windows, bookings_by_day[day], cutoff)
+    return month_slots
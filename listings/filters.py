@@ -1,7 +1,8 @@
 import django_filters
-from django.db import models
 
-from .models import Listing
+from core.search import search
+
+from .models import LISTING_SEARCH_INDEX, Booking, Listing
 
 
 class ListingFilter(django_filters.FilterSet):
@@ -18,11 +19,18 @@ class ListingFilter(django_filters.FilterSet):
         fields = ["price"]
 
     def filter_search(self, queryset, name, value):
-        if value:
-            queryset = queryset.filter(
-                models.Q(title__icontains=value)
-                | models.Q(description__icontains=value)
-                | models.Q(subject__icontains=value)
-                | models.Q(category__icontains=value)
-            )
-        return queryset
+        return search(queryset, LISTING_SEARCH_INDEX, value)
+
+
+class BookingFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(choices=Booking.Status.choices, label="Status")
+    date_from = django_filters.DateFilter(
+        field_name="date", lookup_expr="gte", label="From"
+    )
+    date_to = django_filters.DateFilter(
+        field_name="date", lookup_expr="lte", label="To"
+    )
+
+    class Meta:
+        model = Booking
+        fields = ["status"]
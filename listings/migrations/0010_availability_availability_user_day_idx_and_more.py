@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0004_job_job_status_created_idx"),
+        ("listings", "0009_remove_listing_max_hours_per_booking_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(
+                fields=["user", "day_of_week", "is_active"],
+                name="availability_user_day_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["listing", "date", "status"], name="booking_listing_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "confirmed"])),
+                fields=["listing", "date", "start_time"],
+                name="booking_active_slot_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["type", "is_active", "-created_at"],
+                name="listing_type_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["type", "-created_at"],
+                name="listing_active_browse_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["reviewed_user", "rating"], name="review_reviewed_rating_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from core.search import SearchIndex, install_search_index, uninstall_search_index
+
+LISTING_SEARCH_INDEX = SearchIndex(
+    "listings_listing",
+    (("title", "A"), ("subject", "B"), ("category", "B"), ("description", "C")),
+)
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection, LISTING_SEARCH_INDEX)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection, LISTING_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0010_availability_availability_user_day_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Active bookings of a listing may not overlap. Postgres only: elsewhere
+# listings.availability.create_booking's locked check is the guarantee.
+ADD_CONSTRAINT = """
+ALTER TABLE listings_booking ADD CONSTRAINT booking_no_overlap
+EXCLUDE USING gist (
+    listing_id WITH =,
+    (tsrange("date" + start_time, "date" + end_time, '[)')) WITH &&
+)
+WHERE (status IN ('pending', 'confirmed'))
+"""
+
+DROP_CONSTRAINT = (
+    "ALTER TABLE listings_booking DROP CONSTRAINT IF EXISTS booking_no_overlap"
+)
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        schema_editor.execute(ADD_CONSTRAINT)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0012_availability_updated_at_listing_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
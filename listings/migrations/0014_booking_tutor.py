@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_listing_user(apps, schema_editor):
+    Booking = apps.get_model("listings", "Booking")
+    Listing = apps.get_model("listings", "Listing")
+    Booking.objects.update(
+        tutor_id=Subquery(
+            Listing.objects.filter(pk=OuterRef("listing_id")).values("user_id")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0013_booking_no_overlap"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Made non-null in 0015: Postgres cannot alter the table in the same
+    # transaction as the update, which leaves foreign key checks pending.
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="tutor",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tutor_bookings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(copy_listing_user, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+listing_no_overlap = import_module("listings.migrations.0013_booking_no_overlap")
+
+# Active bookings of a tutor may not overlap, whichever of their listings
+# they are for. Postgres only, like 0013 which it replaces.
+ADD_CONSTRAINT = """
+ALTER TABLE listings_booking ADD CONSTRAINT booking_tutor_no_overlap
+EXCLUDE USING gist (
+    tutor_id WITH =,
+    (tsrange("date" + start_time, "date" + end_time, '[)')) WITH &&
+)
+WHERE (status IN ('pending', 'confirmed'))
+"""
+
+DROP_CONSTRAINT = (
+    "ALTER TABLE listings_booking DROP CONSTRAINT IF EXISTS booking_tutor_no_overlap"
+)
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(listing_no_overlap.DROP_CONSTRAINT)
+        schema_editor.execute(ADD_CONSTRAINT)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_CONSTRAINT)
+        schema_editor.execute(listing_no_overlap.ADD_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("listings", "0014_booking_tutor"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="booking",
+            name="tutor",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tutor_bookings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="booking_active_slot_idx",
+        ),
+        # Slot and conflict lookups go through the tutor now.
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="booking_listing_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "confirmed"])),
+                fields=["tutor", "date", "start_time"],
+                name="booking_tutor_active_slot_idx",
+            ),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
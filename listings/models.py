@@ -1,8 +1,35 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils import timezone
 
+from core.cache import Namespace
+from core.search import SearchIndex
+
+TILE_CACHE = Namespace("listing-tile")
+
+
+class ListingQuerySet(models.QuerySet):
+    def with_tutor_stats(self):
+        """Annotate the tutor's rating and lesson counters onto each listing.
+
+        The values come from the reputation counters on the tutor's account,
+        so they are fetched in the same statement as the listings themselves.
+        """
+
+        return self.select_related("user").annotate(
+            tutor_rating=Coalesce(
+                Cast("user__rating_sum", models.FloatField())
+                / NullIf("user__rating_count", 0),
+                0.0,
+                output_field=models.FloatField(),
+            ),
+            tutor_review_count=models.F("user__rating_count"),
+            tutor_completed_lessons=models.F("user__completed_lessons"),
+        )
+
 
 class Listing(models.Model):
     class ListingType(models.TextChoices):
@@ -22,13 +49,76 @@ class Listing(models.Model):
     category = models.CharField(max_length=100, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ListingQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["type", "is_active", "-created_at"],
+                name="listing_type_active_idx",
+            ),
+            models.Index(
+                fields=["type", "-created_at"],
+                condition=models.Q(is_active=True),
+                name="listing_active_browse_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_type_display()}: {self.title}"
 
+    def clean(self):
+        from .availability import owner_change_conflicts
+
+        if self.pk and self.user_id and owner_change_conflicts(self).exists():
+            raise ValidationError(
+                {
+                    "user": "This tutor is already booked at the time of one of "
+                    "this listing's active bookings."
+                }
+            )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.pk is None or self.user_id == getattr(self, "_saved_user_id", None):
+            super().save(*args, **kwargs)
+        else:
+            # Booking.tutor copies the owner, so the bookings move with it.
+            from .availability import owner_change
+
+            with owner_change(self):
+                super().save(*args, **kwargs)
+        self._saved_user_id = self.user_id
+
+    @property
+    def tile_scopes(self) -> list[tuple]:
+        """Version stamps the rendered browse tile depends on."""
+
+        return [("listing", self.pk), ("tutor", self.user_id)]
+
+    def invalidate_tile(self) -> None:
+        TILE_CACHE.invalidate("listing", self.pk)
+
+    @staticmethod
+    def invalidate_tutor_tiles(user_id: int) -> None:
+        """Expire the tiles of every listing owned by ``user_id``."""
+
+        TILE_CACHE.invalidate("tutor", user_id)
+
+
+LISTING_SEARCH_INDEX = SearchIndex(
+    Listing._meta.db_table,
+    (("title", "A"), ("subject", "B"), ("category", "B"), ("description", "C")),
+)
+
 
 class Availability(models.Model):
     class DayOfWeek(models.IntegerChoices):
@@ -49,10 +139,17 @@ class Availability(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["day_of_week", "start_time"]
         verbose_name_plural = "Availabilities"
+        indexes = [
+            models.Index(
+                fields=["user", "day_of_week", "is_active"],
+                name="availability_user_day_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_day_of_week_display()} {self.start_time}-{self.end_time}"
@@ -71,6 +168,15 @@ class Booking(models.Model):
     student = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="bookings"
     )
+    # Copy of listing.user, so conflicts across all of a tutor's listings are
+    # found through one index. Kept in sync by save() and by
+    # availability.owner_change.
+    tutor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tutor_bookings",
+        editable=False,
+    )
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
@@ -86,10 +192,35 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["tutor", "date", "start_time"],
+                condition=models.Q(status__in=["pending", "confirmed"]),
+                name="booking_tutor_active_slot_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.username} -> {self.listing.title} on {self.date} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_listing_id = instance.__dict__.get("listing_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The tutor follows the listing, also when the booking is moved to
+        # another one, e.g. in the admin.
+        saved_listing_id = getattr(self, "_saved_listing_id", None)
+        if self.tutor_id is None or self.listing_id != saved_listing_id:
+            self.tutor_id = self.listing.user_id
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "tutor"}
+        super().save(*args, **kwargs)
+        self._saved_listing_id = self.listing_id
+
 
 class Review(models.Model):
     reviewer = models.ForeignKey(
@@ -122,6 +253,15 @@ class Review(models.Model):
     class Meta:
         ordering = ["-created_at"]
         unique_together = [("reviewer", "booking"), ("reviewer", "job")]
+        indexes = [
+            models.Index(
+                fields=["reviewed_user", "rating"],
+                name="review_reviewed_rating_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.reviewer.username} -> {self.reviewed_user.username} ({self.rating} stars)"
+
+    def invalidate_tutor_tiles(self) -> None:
+        Listing.invalidate_tutor_tiles(self.reviewed_user_id)
@@ -0,0 +1,92 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users import reputation
+from users.models import Account
+
+from .models import Booking, Listing, Review
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    instance._reputation_previous = None
+    if instance.pk and not raw:
+        instance._reputation_previous = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("reviewed_user_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_reputation_previous", None)
+    if previous and not created:
+        previous_user_id, previous_rating = previous
+        if previous_user_id == instance.reviewed_user_id:
+            reputation.adjust_rating(
+                instance.reviewed_user_id, instance.rating - previous_rating, 0
+            )
+            instance.invalidate_tutor_tiles()
+            return
+        reputation.adjust_rating(previous_user_id, -previous_rating, -1)
+        Listing.invalidate_tutor_tiles(previous_user_id)
+    reputation.adjust_rating(instance.reviewed_user_id, instance.rating, 1)
+    instance.invalidate_tutor_tiles()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    reputation.adjust_rating(instance.reviewed_user_id, -instance.rating, -1)
+    instance.invalidate_tutor_tiles()
+
+
+def _completed_tutor(status, tutor_id):
+    return tutor_id if status == Booking.Status.COMPLETED else None
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_completion(sender, instance, raw=False, **kwargs):
+    instance._reputation_previous = None
+    if instance.pk and not raw:
+        previous = (
+            Booking.objects.filter(pk=instance.pk)
+            .values_list("status", "tutor_id")
+            .first()
+        )
+        if previous:
+            instance._reputation_previous = _completed_tutor(*previous)
+
+
+@receiver(post_save, sender=Booking)
+def update_completed_lessons_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_tutor_id = getattr(instance, "_reputation_previous", None)
+    tutor_id = _completed_tutor(instance.status, instance.tutor_id)
+    if previous_tutor_id != tutor_id:
+        reputation.adjust_completed_lessons(previous_tutor_id, -1)
+        reputation.adjust_completed_lessons(tutor_id, 1)
+
+
+@receiver(post_delete, sender=Booking)
+def update_completed_lessons_on_delete(sender, instance, **kwargs):
+    if instance.status == Booking.Status.COMPLETED:
+        reputation.adjust_completed_lessons(instance.tutor_id, -1)
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing_tile(sender, instance, **kwargs):
+    instance.invalidate_tile()
+
+
+TILE_ACCOUNT_FIELDS = {"username", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=Account)
+def invalidate_tutor_tiles_on_rename(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or TILE_ACCOUNT_FIELDS & set(update_fields):
+        Listing.invalidate_tutor_tiles(instance.pk)
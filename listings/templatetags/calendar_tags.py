@@ -33,8 +33,8 @@ def render_calendar(
 
     # Default to 24/7 availability - all days are available
     # (If specific availabilities exist, use those instead)
-    if tutor_availabilities and tutor_availabilities.exists():
-        available_days = set(tutor_availabilities.values_list("day_of_week", flat=True))
+    if tutor_availabilities:
+        available_days = {a.day_of_week for a in tutor_availabilities}
     else:
         # All days are available by default (0-6 = Mon-Sun)
         available_days = {0, 1, 2, 3, 4, 5, 6}
@@ -0,0 +1,11 @@
+from django import template
+
+from listings.tiles import render_tiles
+
+register = template.Library()
+
+
+@register.simple_tag
+def listing_tiles(listings):
+    """Render the browse tiles of ``listings`` through the tile fragment cache."""
+    return render_tiles(listings)
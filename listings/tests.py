@@ -1 +1,1120 @@
-# Create your tests here.
+import base64
+import json
+from collections import Counter
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pagination import CursorPaginator, InvalidCursor
+from core.routers import PIN_COOKIE
+from core.search import (
+    SubstringSearchBackend,
+    get_search_backend,
+    repair_search_triggers,
+    search,
+)
+from core.testing import (
+    ChangelistQueryMixin,
+    QueryBudgetMixin,
+    QueryPlanMixin,
+    run_concurrently,
+)
+from users.models import Account
+
+from . import availability, tiles
+from .api import ListingAPIView
+from .availability import ACTIVE_BOOKING_STATUSES
+from .models import (
+    LISTING_SEARCH_INDEX,
+    TILE_CACHE,
+    Availability,
+    Booking,
+    Listing,
+    Review,
+)
+
+
+def logged_in_clients(users) -> list[Client]:
+    clients = [Client() for _ in users]
+    for client, user in zip(clients, users):
+        client.force_login(user)
+    return clients
+
+
+class SlotComputationTests(SimpleTestCase):
+    day = date(2026, 3, 2)
+
+    def starts(self, slots):
+        return [(slot.value, slot.is_available) for slot in slots]
+
+    def test_merge_touching_and_overlapping_intervals(self):
+        self.assertEqual(
+            availability.merge_intervals(
+                [
+                    (time(13), time(14)),
+                    (time(9), time(10)),
+                    (time(10), time(11)),
+                    (time(12), time(15)),
+                    (time(8), time(8)),
+                ]
+            ),
+            [(9 * 60, 11 * 60), (12 * 60, 15 * 60)],
+        )
+
+    def test_window_ending_on_slot_boundary(self):
+        slots = availability.compute_slots(self.day, [(time(9), time(11))], [])
+        self.assertEqual(self.starts(slots), [("09:00", True), ("10:00", True)])
+
+    def test_overlapping_windows_and_bookings(self):
+        slots = availability.compute_slots(
+            self.day,
+            [(time(9), time(11)), (time(10), time(12))],
+            # A half-hour booking still takes the whole slot it overlaps.
+            [(time(9, 30), time(10)), (time(11), time(12))],
+        )
+        self.assertEqual(
+            self.starts(slots),
+            [("09:00", False), ("10:00", True), ("11:00", False)],
+        )
+
+    def test_booking_touching_a_slot_leaves_it_free(self):
+        slots = availability.compute_slots(
+            self.day, [(time(9), time(12))], [(time(10), time(11))]
+        )
+        self.assertEqual(
+            self.starts(slots), [("09:00", True), ("10:00", False), ("11:00", True)]
+        )
+
+    def test_cutoff(self):
+        windows = [(time(9), time(12))]
+        cutoff = datetime.combine(self.day, time(10, 0, 1))
+        self.assertEqual(availability.cutoff_minutes(self.day, cutoff), 10 * 60 + 1)
+        slots = availability.compute_slots(self.day, windows, [], cutoff)
+        self.assertEqual(self.starts(slots), [("11:00", True)])
+
+        on_the_hour = datetime.combine(self.day, time(10))
+        slots = availability.compute_slots(self.day, windows, [], on_the_hour)
+        self.assertEqual(self.starts(slots), [("10:00", True), ("11:00", True)])
+
+        earlier_day = datetime.combine(self.day - timedelta(days=1), time(23))
+        self.assertEqual(
+            len(availability.compute_slots(self.day, windows, [], earlier_day)), 3
+        )
+
+    def test_empty_results(self):
+        later_day = datetime.combine(self.day + timedelta(days=1), time(0))
+        self.assertIsNone(availability.cutoff_minutes(self.day, later_day))
+        self.assertEqual(
+            availability.compute_slots(self.day, [(time(9), time(12))], [], later_day),
+            [],
+        )
+        self.assertEqual(availability.compute_slots(self.day, [], []), [])
+        self.assertEqual(
+            availability.compute_slots(self.day, [(time(12), time(9))], []), []
+        )
+
+
+class HotQueryIndexTests(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Algebra", price=10
+        )
+
+    def test_booking_day_lookup_uses_index(self):
+        self.assertUsesIndex(
+            Booking.objects.filter(
+                tutor=self.tutor,
+                date=date.today(),
+                status__in=ACTIVE_BOOKING_STATUSES,
+            ).values_list("start_time", "end_time")
+        )
+
+    def test_booking_overlap_check_uses_index(self):
+        self.assertUsesIndex(
+            availability.overlapping_bookings(
+                self.tutor.pk, date.today(), time(10), time(11)
+            )
+        )
+
+    def test_booking_month_range_uses_index(self):
+        self.assertUsesIndex(
+            Booking.objects.filter(
+                tutor=self.tutor,
+                date__range=(date.today().replace(day=1), date.today()),
+                status__in=ACTIVE_BOOKING_STATUSES,
+            ).values_list("date", "start_time", "end_time")
+        )
+
+    def test_availability_lookup_uses_index(self):
+        self.assertUsesIndex(
+            Availability.objects.filter(
+                user=self.tutor, day_of_week=date.today().weekday(), is_active=True
+            )
+        )
+
+    def test_listing_browse_uses_index(self):
+        for listing_type in Listing.ListingType:
+            self.assertUsesIndex(
+                Listing.objects.filter(type=listing_type, is_active=True).order_by(
+                    "-created_at"
+                )
+            )
+
+    def test_review_rating_lookup_uses_index(self):
+        self.assertUsesIndex(
+            Review.objects.filter(reviewed_user=self.tutor).values_list("rating")
+        )
+
+
+class AdminChangelistQueryTests(ChangelistQueryMixin, QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            tutor = Account.objects.create_user(
+                f"tutor{i}", role_level=Account.Role.TUTOR
+            )
+            student = Account.objects.create_user(f"student{i}")
+            listing = Listing.objects.create(
+                user=tutor, title=f"Listing {i}", description="Lessons", price=10
+            )
+            Availability.objects.create(
+                user=tutor, day_of_week=i, start_time=time(9), end_time=time(17)
+            )
+            booking = Booking.objects.create(
+                listing=listing,
+                student=student,
+                date=date.today(),
+                start_time=time(9),
+                end_time=time(10),
+                duration_hours=1,
+            )
+            Review.objects.create(
+                reviewer=student,
+                reviewed_user=tutor,
+                booking=booking,
+                rating=5,
+                comment="Great",
+            )
+
+    def test_listing_changelist(self):
+        self.assertChangelistQueries(Listing, 4)
+
+    def test_availability_changelist(self):
+        self.assertChangelistQueries(Availability, 4)
+
+    def test_booking_changelist(self):
+        self.assertChangelistQueries(Booking, 4)
+
+    def test_review_changelist(self):
+        self.assertChangelistQueries(Review, 5)
+
+    def test_booking_search_uses_index(self):
+        for term in ("student1", "tutor1", str(Booking.objects.first().pk)):
+            self.assertUsesIndex(self.assertSearchFinds(Booking, term, 1))
+
+    def test_review_search_uses_index(self):
+        for term in ("student1", "tutor1"):
+            self.assertUsesIndex(self.assertSearchFinds(Review, term, 1))
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        for day in range(7):
+            Availability.objects.create(
+                user=cls.tutor, day_of_week=day, start_time=time(9), end_time=time(17)
+            )
+        cls.listings = [
+            Listing.objects.create(
+                user=cls.tutor, title=f"Listing {i}", description="Lessons", price=10
+            )
+            for i in range(9)
+        ]
+        for i in range(5):
+            student = Account.objects.create_user(f"student{i}")
+            booking = Booking.objects.create(
+                listing=cls.listings[i],
+                student=student,
+                date=date.today() + timedelta(days=i + 1),
+                start_time=time(10),
+                end_time=time(11),
+                duration_hours=1,
+                status=Booking.Status.COMPLETED,
+            )
+            Review.objects.create(
+                reviewer=student,
+                reviewed_user=cls.tutor,
+                booking=booking,
+                rating=5,
+                comment="Great",
+            )
+
+    def setUp(self):
+        # Budgets hold for a cold cache.
+        cache.clear()
+        self.client.force_login(self.tutor)
+
+    def test_listings(self):
+        with self.assertMaxQueries("listings"):
+            response = self.client.get(reverse("listings"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_listing_detail(self):
+        url = reverse("listing-detail", args=[self.listings[0].pk])
+        with self.assertMaxQueries("listing-detail"):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_booking(self):
+        url = reverse("create-booking", args=[self.listings[0].pk])
+        with self.assertMaxQueries("create-booking"):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_booking_post(self):
+        student = Account.objects.create_user("booker")
+        self.client.force_login(student)
+        url = reverse("create-booking", args=[self.listings[0].pk])
+        data = {"date": date.today() + timedelta(days=1), "start_time": "14:00"}
+        with self.assertMaxQueries("create-booking"):
+            response = self.client.post(url, data)
+        self.assertRedirects(
+            response, reverse("student-bookings"), fetch_redirect_response=False
+        )
+        self.assertTrue(Booking.objects.filter(student=student).exists())
+
+    def test_my_bookings(self):
+        with self.assertMaxQueries("my-bookings"):
+            response = self.client.get(reverse("my-bookings"))
+        self.assertEqual(response.status_code, 200)
+
+
+class ListingSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.in_title, cls.in_description, cls.unrelated = (
+            Listing.objects.create(
+                user=cls.tutor, title=title, description=description, price=10
+            )
+            for title, description in (
+                ("Algebra tutoring", "Equations and the basics"),
+                ("Maths help", "Algebra, geometry and the rest"),
+                ("Piano lessons", "Scales and chords"),
+            )
+        )
+
+    def search(self, value):
+        return list(search(Listing.objects.order_by("pk"), LISTING_SEARCH_INDEX, value))
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search("algebra"), [self.in_title, self.in_description])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("algebra geometry"), [self.in_description])
+        self.assertEqual(self.search("algebra piano"), [])
+
+    def test_matches_prefixes(self):
+        self.assertEqual(self.search("pian"), [self.unrelated])
+
+    def test_browse_page_uses_search_order(self):
+        response = self.client.get(reverse("listings"), {"q": "algebra"})
+        self.assertEqual(
+            list(response.context["listings"]), [self.in_title, self.in_description]
+        )
+
+    def test_follows_edits_and_deletes(self):
+        self.unrelated.title = "Guitar lessons"
+        self.unrelated.save()
+        self.assertEqual(self.search("piano"), [])
+        self.assertEqual(self.search("guitar"), [self.unrelated])
+
+        created = Listing.objects.create(
+            user=self.tutor, title="Violin", description="Bowing", price=10
+        )
+        self.assertEqual(self.search("violin"), [created])
+        created.delete()
+        self.assertEqual(self.search("violin"), [])
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite FTS5 triggers")
+    def test_repair_after_table_rebuild(self):
+        # A migration rebuilding the table drops its triggers.
+        with connection.cursor() as cursor:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER listings_listing_fts_{suffix}")
+        missed = Listing.objects.create(
+            user=self.tutor, title="Violin", description="Bowing", price=10
+        )
+        self.assertEqual(self.search("violin"), [])
+
+        repair_search_triggers(connection, LISTING_SEARCH_INDEX)
+        self.assertEqual(self.search("violin"), [missed])
+        missed.title = "Cello"
+        missed.save()
+        self.assertEqual(self.search("cello"), [missed])
+
+    @override_settings(SEARCH_BACKEND="core.search.SubstringSearchBackend")
+    def test_substring_backend(self):
+        self.assertIsInstance(get_search_backend(), SubstringSearchBackend)
+        # Matches inside words, unlike the full-text index, but unranked.
+        self.assertEqual(self.search("lgebr"), [self.in_title, self.in_description])
+
+    @skipUnless(connection.vendor == "postgresql", "Postgres stopwords")
+    def test_stopwords_only_falls_back_to_substrings(self):
+        with self.assertNumQueries(1):
+            found = self.search("the")
+        self.assertEqual(found, [self.in_title, self.in_description])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search("piano"), [self.unrelated])
+
+
+class TileCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        for i in range(9):
+            Listing.objects.create(
+                user=tutor, title=f"Listing {i}", description="Lessons", price=10
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self):
+        listings = Listing.objects.with_tutor_stats().order_by("pk")
+        calls = Counter()
+        backend = TILE_CACHE.cache
+        nested = []
+
+        def counted(name):
+            method = getattr(backend, name)
+
+            # Only round trips: local memory's get_many calls get.
+            def call(*args, **kwargs):
+                if not nested:
+                    calls[name] += 1
+                nested.append(name)
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    nested.pop()
+
+            return call
+
+        with ExitStack() as stack:
+            for name in ("get", "get_many", "set", "set_many", "add", "incr"):
+                stack.enter_context(mock.patch.object(backend, name, counted(name)))
+            html = tiles.render_tiles(listings)
+        return html, sum(calls.values())
+
+    def test_page_of_tiles_costs_constant_round_trips(self):
+        cold, _ = self.render()
+        self.render()
+        warm, round_trips = self.render()
+        self.assertEqual(warm, cold)
+        # Stamps, tiles and the hit counter.
+        self.assertEqual(round_trips, 3)
+        self.assertEqual(TILE_CACHE.stats()["hits"], 18)
+
+    def test_edit_rerenders_only_its_tile(self):
+        self.render()
+        listing = Listing.objects.order_by("pk").first()
+        listing.title = "Renamed"
+        listing.save()
+        TILE_CACHE.reset_stats()
+
+        html, _ = self.render()
+        self.assertIn("Renamed", html[0])
+        self.assertEqual(
+            TILE_CACHE.stats(), {"hits": 8, "misses": 1, "hit_rate": 0.8889}
+        )
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        now = timezone.now().replace(microsecond=123456)
+        # Five listings share a created_at; the id breaks the tie.
+        for i, created_at in enumerate([now] * 5 + [now - timedelta(hours=1)] * 2):
+            Listing.objects.create(
+                user=tutor,
+                title=f"Listing {i}",
+                description="Lessons",
+                price=10,
+                created_at=created_at,
+            )
+        cls.expected = list(Listing.objects.order_by("-created_at", "-id"))
+
+    def paginator(self):
+        return CursorPaginator(Listing.objects.all(), 2)
+
+    def encode(self, payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def test_cursor_round_trip(self):
+        listing = self.expected[0]
+        paginator = self.paginator()
+        direction, key = paginator.decode_cursor(paginator.encode_cursor(listing, "p"))
+        self.assertEqual((direction, key), ("p", [listing.created_at, listing.pk]))
+
+    def test_pages_forward_and_back_through_ties(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([row for page in pages for row in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+
+        # Previous pages come back in the same order as on the way forward.
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual(list(page), list(expected))
+        self.assertFalse(page.has_previous())
+
+    def test_tampered_cursors(self):
+        listing = self.expected[0]
+        cursors = [
+            "!!!",
+            "bm90IGpzb24",
+            self.encode([]),
+            self.encode({"d": "x", "k": ["2026-01-01T00:00:00+00:00", 1]}),
+            self.encode({"d": "n", "k": [1]}),
+            self.encode({"d": "n", "k": [None, listing.pk]}),
+            self.encode({"d": "n", "k": ["yesterday", listing.pk]}),
+            self.encode({"d": "n", "k": ["2026-01-01T00:00:00+00:00", {}]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    self.paginator().page(cursor)
+                response = self.client.get(reverse("listings"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_browse_page_after_cursor(self):
+        cursor = self.paginator().encode_cursor(self.expected[1], "n")
+        response = self.client.get(reverse("listings"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["page_obj"]), self.expected[2:])
+
+
+class ListingAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        for i in range(5):
+            Listing.objects.create(
+                user=tutor, title=f"Listing {i}", description="Lessons", price=10
+            )
+        Listing.objects.create(
+            user=tutor,
+            type=Listing.ListingType.MENTOR,
+            title="Careers",
+            description="Mentoring",
+            price=20,
+        )
+        cls.url = reverse("api-v1-listings")
+
+    def test_fields_projection(self):
+        response = self.client.get(self.url, {"fields": "title, tutor,title"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], {"title": "Listing 4", "tutor": "tutor"})
+
+        default = self.client.get(self.url).json()["results"][0]
+        self.assertEqual(set(default), set(ListingAPIView.default_fields))
+
+    def test_bad_requests(self):
+        for params in (
+            {"fields": "title,password"},
+            {"fields": ","},
+            {"cursor": "garbage"},
+            {"limit": "0"},
+            {"limit": "many"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        unknown = self.client.get(self.url, {"fields": "title,password"}).json()
+        self.assertEqual(unknown["unknown"], ["password"])
+
+    def test_next_and_previous_links(self):
+        first = self.client.get(self.url, {"limit": 2, "fields": "id"}).json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        self.assertIn("fields=id", first["next"])
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+
+        ids = [row["id"] for row in first["results"] + second["results"]]
+        page = second
+        while page["next"]:
+            page = self.client.get(page["next"]).json()
+            ids += [row["id"] for row in page["results"]]
+        self.assertEqual(
+            ids,
+            list(
+                Listing.objects.filter(type=Listing.ListingType.TUTOR)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("max-age", response["Cache-Control"])
+        cached = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(cached.status_code, 304)
+
+        Listing.objects.filter(title="Listing 4").update(title="Renamed")
+        changed = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_mentor_endpoint(self):
+        results = self.client.get(
+            reverse("api-v1-mentors"), {"fields": "title"}
+        ).json()["results"]
+        self.assertEqual(results, [{"title": "Careers"}])
+
+
+class ListingDetailConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Lessons", price=10
+        )
+        cls.url = reverse("listing-detail", args=[cls.listing.pk])
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        for headers in (
+            {"if-none-match": response["ETag"]},
+            {"if-modified-since": response["Last-Modified"]},
+        ):
+            with self.subTest(headers=headers):
+                cached = self.client.get(self.url, headers=headers)
+                self.assertEqual(cached.status_code, 304)
+
+    def test_validators_change_after_edits(self):
+        etags = [self.client.get(self.url)["ETag"]]
+        edits = (
+            lambda: Listing.objects.filter(pk=self.listing.pk).update(
+                title="Geometry", updated_at=timezone.now()
+            ),
+            lambda: Availability.objects.create(
+                user=self.tutor, day_of_week=0, start_time=time(9), end_time=time(17)
+            ),
+            lambda: Review.objects.create(
+                reviewer=Account.objects.create_user("student"),
+                reviewed_user=self.tutor,
+                rating=4,
+            ),
+        )
+        for edit in edits:
+            edit()
+            response = self.client.get(self.url, headers={"if-none-match": etags[-1]})
+            self.assertEqual(response.status_code, 200)
+            etags.append(response["ETag"])
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_etag_covers_the_viewer(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.tutor)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+
+class BookingListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.student = Account.objects.create_user("student")
+        listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Lessons", price=10
+        )
+        cls.first_day = date.today() + timedelta(days=1)
+        for i in range(25):
+            Booking.objects.create(
+                listing=listing,
+                student=cls.student,
+                date=cls.first_day + timedelta(days=i),
+                start_time=time(10),
+                end_time=time(11),
+                duration_hours=1,
+                status=Booking.Status.PENDING if i < 3 else Booking.Status.COMPLETED,
+            )
+
+    def bookings(self, user, url_name, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_twenty_per_page(self):
+        for user, url_name in (
+            (self.tutor, "my-bookings"),
+            (self.student, "student-bookings"),
+        ):
+            with self.subTest(url_name=url_name):
+                first = self.bookings(user, url_name)
+                self.assertEqual(len(first.context["bookings"]), 20)
+                self.assertTrue(first.context["is_paginated"])
+                second = self.bookings(user, url_name, page=2)
+                self.assertEqual(len(second.context["bookings"]), 5)
+
+    def test_status_and_date_filters(self):
+        pending = self.bookings(self.tutor, "my-bookings", status="pending")
+        self.assertEqual(
+            {booking.status for booking in pending.context["bookings"]}, {"pending"}
+        )
+        self.assertEqual(len(pending.context["bookings"]), 3)
+
+        dated = self.bookings(
+            self.student,
+            "student-bookings",
+            date_from=self.first_day + timedelta(days=2),
+            date_to=self.first_day + timedelta(days=5),
+        )
+        self.assertEqual(len(dated.context["bookings"]), 4)
+
+    def test_page_links_keep_the_filters_encoded(self):
+        response = self.bookings(
+            self.tutor, "my-bookings", status="completed", note="a b&c"
+        )
+        self.assertContains(
+            response, "?status=completed&amp;note=a+b%26c&amp;page=2", count=1
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite tuning")
+class SQLiteConcurrencyTests(TransactionTestCase):
+    writers = 8
+    bookings_per_writer = 5
+
+    def setUp(self):
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        self.listing = Listing.objects.create(
+            user=tutor, title="Algebra", description="Algebra", price=10
+        )
+        self.students = [
+            Account.objects.create_user(f"student{i}") for i in range(self.writers)
+        ]
+
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_concurrent_booking_writers(self):
+        url = reverse("create-booking", args=[self.listing.pk])
+        first_day = date.today() + timedelta(days=1)
+        statuses = []
+
+        def write(index, client):
+            for n in range(self.bookings_per_writer):
+                # One transaction per request, as with ATOMIC_REQUESTS: it
+                # reads before it writes, which fails straight away with
+                # "database is locked" under deferred transactions.
+                with transaction.atomic():
+                    response = client.post(
+                        url,
+                        {
+                            "date": first_day + timedelta(days=n),
+                            "start_time": f"{6 + index:02d}:00",
+                        },
+                    )
+                statuses.append(response.status_code)
+
+        errors = run_concurrently(
+            write, list(enumerate(logged_in_clients(self.students)))
+        )
+
+        self.assertEqual(errors, [])
+        total = self.writers * self.bookings_per_writer
+        self.assertEqual(statuses, [302] * total)
+        self.assertEqual(Booking.objects.count(), total)
+
+
+@override_settings(
+    DATABASE_REPLICA="replica",
+    # Sessions would otherwise have to be replicated too.
+    SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies",
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        self.listing = Listing.objects.create(
+            user=tutor, title="Algebra", description="Algebra", price=10
+        )
+        self.student = Account.objects.create_user("student")
+        # The rows a caught-up replica shares with the primary.
+        for obj in (tutor, self.listing, self.student):
+            type(obj).objects.using("replica").bulk_create([obj])
+        self.client.force_login(self.student)
+
+    def student_bookings(self):
+        response = self.client.get(reverse("student-bookings"))
+        return len(response.context["bookings"])
+
+    def test_reads_your_writes_then_replica(self):
+        self.assertEqual(self.student_bookings(), 0)
+
+        response = self.client.post(
+            reverse("create-booking", args=[self.listing.pk]),
+            {"date": date.today() + timedelta(days=1), "start_time": "10:00"},
+        )
+        self.assertRedirects(response, reverse("student-bookings"))
+        self.assertEqual(Booking.objects.using("default").count(), 1)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # Pinned to the primary, so the new booking shows up.
+        self.assertEqual(self.student_bookings(), 1)
+
+        # Once the pin expires reads go to the replica, which has not
+        # replicated the booking here.
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.student_bookings(), 0)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    students = 8
+    rounds = 3
+
+    def setUp(self):
+        tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        # Students race for the same hour of one tutor through two listings.
+        self.listings = [
+            Listing.objects.create(
+                user=tutor, title=title, description="Lessons", price=10
+            )
+            for title in ("Algebra", "Geometry")
+        ]
+        self.clients = logged_in_clients(
+            [Account.objects.create_user(f"student{i}") for i in range(self.students)]
+        )
+
+    def test_one_booking_per_contended_slot(self):
+        urls = [
+            reverse("create-booking", args=[listing.pk]) for listing in self.listings
+        ]
+        for day in range(1, self.rounds + 1):
+            statuses = []
+            data = {"date": date.today() + timedelta(days=day), "start_time": "10:00"}
+
+            def book(client, url):
+                statuses.append(client.post(url, data).status_code)
+
+            errors = run_concurrently(
+                book,
+                [
+                    (client, urls[index % len(urls)])
+                    for index, client in enumerate(self.clients)
+                ],
+            )
+
+            self.assertEqual(errors, [])
+            # One redirect to the new booking, the form again for the rest.
+            self.assertEqual(sorted(statuses), [200] * (self.students - 1) + [302])
+            self.assertEqual(
+                Booking.objects.filter(
+                    date=data["date"], status__in=ACTIVE_BOOKING_STATUSES
+                ).count(),
+                1,
+            )
+
+
+class BookingExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.other_tutor = Account.objects.create_user(
+            "other", role_level=Account.Role.TUTOR
+        )
+        cls.student = Account.objects.create_user("student")
+        for tutor in (cls.tutor, cls.other_tutor):
+            listing = Listing.objects.create(
+                user=tutor, title="Algebra", description="Lessons", price=10
+            )
+            Booking.objects.create(
+                listing=listing,
+                student=cls.student,
+                date=date.today(),
+                start_time=time(10),
+                end_time=time(11),
+                duration_hours=1,
+            )
+
+    def export(self, user, url_name):
+        self.client.force_login(user)
+        response = self.client.get(reverse(url_name), {"format": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return response["Content-Disposition"], len(lines)
+
+    def test_scopes(self):
+        disposition, rows = self.export(self.tutor, "my-bookings-export")
+        self.assertIn("tutor-bookings-", disposition)
+        self.assertEqual(rows, 1)
+        disposition, rows = self.export(self.student, "student-bookings-export")
+        self.assertIn("student-bookings-", disposition)
+        self.assertEqual(rows, 2)
+
+    def test_all_bookings_are_for_staff(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse("booking-export-all"))
+        self.assertEqual(response.status_code, 302)
+        staff = Account.objects.create_user("staff", is_staff=True)
+        disposition, rows = self.export(staff, "booking-export-all")
+        self.assertIn("all-bookings-", disposition)
+        self.assertEqual(rows, 2)
+
+
+class BookingStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Lessons", price=10
+        )
+        cls.students = [Account.objects.create_user(f"student{i}") for i in range(2)]
+        cls.data = {"date": date.today() + timedelta(days=1), "start_time": "10:00"}
+
+    def book(self, student):
+        self.client.force_login(student)
+        self.client.post(reverse("create-booking", args=[self.listing.pk]), self.data)
+        return Booking.objects.filter(student=student).latest("pk")
+
+    def set_status(self, user, booking, status):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("update-booking-status", args=[booking.pk, status]), follow=True
+        )
+
+    def test_cancelled_booking_cannot_retake_a_rebooked_slot(self):
+        first = self.book(self.students[0])
+        self.set_status(self.students[0], first, Booking.Status.CANCELLED)
+        second = self.book(self.students[1])
+
+        for status in ACTIVE_BOOKING_STATUSES:
+            response = self.set_status(self.tutor, first, status)
+            self.assertContains(response, "conflicts with an existing booking")
+            first.refresh_from_db()
+            self.assertEqual(first.status, Booking.Status.CANCELLED)
+
+        self.assertEqual(
+            list(Booking.objects.filter(status__in=ACTIVE_BOOKING_STATUSES)), [second]
+        )
+
+    def test_cancelled_booking_can_be_confirmed_while_slot_is_free(self):
+        booking = self.book(self.students[0])
+        self.set_status(self.students[0], booking, Booking.Status.CANCELLED)
+        self.set_status(self.tutor, booking, Booking.Status.CONFIRMED)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.Status.CONFIRMED)
+
+
+class TutorWideConflictTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = Account.objects.create_user("tutor", role_level=Account.Role.TUTOR)
+        cls.tutoring, cls.mentoring = (
+            Listing.objects.create(
+                user=cls.tutor,
+                type=listing_type,
+                title=listing_type.label,
+                description="Lessons",
+                price=10,
+            )
+            for listing_type in (Listing.ListingType.TUTOR, Listing.ListingType.MENTOR)
+        )
+        cls.student = Account.objects.create_user("student")
+        cls.day = date.today() + timedelta(days=1)
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def book(self, listing, start_time="10:00"):
+        return self.client.post(
+            reverse("create-booking", args=[listing.pk]),
+            {"date": self.day, "start_time": start_time},
+        )
+
+    def slots(self, listing, **headers):
+        return self.client.get(
+            reverse("available-slots", args=[listing.pk]),
+            {"date": self.day.isoformat()},
+            headers=headers,
+        )
+
+    def test_booking_one_listing_takes_the_slot_of_the_other(self):
+        self.assertEqual(self.book(self.tutoring).status_code, 302)
+        self.assertEqual(self.book(self.mentoring).status_code, 200)
+        self.assertEqual(self.book(self.mentoring, "11:00").status_code, 302)
+
+        slots = {
+            slot["value"]: slot["is_available"]
+            for slot in self.slots(self.mentoring).json()["slots"]
+        }
+        self.assertFalse(slots["10:00"])
+        self.assertFalse(slots["11:00"])
+        self.assertTrue(slots["12:00"])
+
+    def test_booking_page_embeds_month_slots(self):
+        self.book(self.tutoring)
+        response = self.client.get(reverse("create-booking", args=[self.mentoring.pk]))
+        self.assertContains(response, 'id="month-slots"')
+        month_slots = response.context["month_slots"]
+        # The booked day, unless it falls in next month.
+        day = min(self.day.isoformat(), max(month_slots))
+        slots = self.client.get(
+            reverse("available-slots", args=[self.mentoring.pk]), {"date": day}
+        ).json()["slots"]
+        self.assertEqual(month_slots[day], slots)
+
+    def test_slots_etag_changes_with_other_listing_bookings(self):
+        etag = self.slots(self.mentoring)["ETag"]
+        self.assertEqual(
+            self.slots(self.mentoring, if_none_match=etag).status_code, 304
+        )
+
+        # Not through the view, whose flash message would skip validation.
+        availability.create_booking(
+            Booking(
+                listing=self.tutoring,
+                student=self.student,
+                date=self.day,
+                start_time=time(10),
+                end_time=time(11),
+                duration_hours=1,
+            )
+        )
+        self.assertEqual(
+            self.slots(self.mentoring, if_none_match=etag).status_code, 200
+        )
+
+
+class ListingOwnerChangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor, cls.other = (
+            Account.objects.create_user(name, role_level=Account.Role.TUTOR)
+            for name in ("tutor", "other")
+        )
+        cls.listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Lessons", price=10
+        )
+        cls.other_listing = Listing.objects.create(
+            user=cls.other, title="Geometry", description="Lessons", price=10
+        )
+        cls.student = Account.objects.create_user("student")
+        cls.day = date.today() + timedelta(days=1)
+
+    def book(self, listing, hour, status=Booking.Status.PENDING):
+        return Booking.objects.create(
+            listing=listing,
+            student=self.student,
+            date=self.day,
+            start_time=time(hour),
+            end_time=time(hour + 1),
+            duration_hours=1,
+            status=status,
+        )
+
+    def completed_lessons(self):
+        return list(
+            Account.objects.filter(pk__in=[self.tutor.pk, self.other.pk])
+            .order_by("username")
+            .values_list("username", "completed_lessons")
+        )
+
+    def test_edits_keeping_the_owner_leave_bookings_alone(self):
+        self.book(self.listing, 10)
+        self.listing.title = "Advanced algebra"
+        with CaptureQueriesContext(connection) as queries:
+            self.listing.save()
+        self.assertFalse([q["sql"] for q in queries if "listings_booking" in q["sql"]])
+
+    def test_bookings_and_counters_follow_listing_to_new_owner(self):
+        self.book(self.listing, 10)
+        self.book(self.listing, 12, Booking.Status.COMPLETED)
+        self.assertEqual(self.completed_lessons(), [("other", 0), ("tutor", 1)])
+
+        self.listing.user = self.other
+        self.listing.save()
+
+        self.assertEqual(
+            set(Booking.objects.values_list("tutor", flat=True)), {self.other.pk}
+        )
+        self.assertEqual(self.completed_lessons(), [("other", 1), ("tutor", 0)])
+
+    def test_failed_move_keeps_the_previous_owner(self):
+        booking = self.book(self.listing, 12, Booking.Status.COMPLETED)
+        self.listing.user = self.other
+        with mock.patch.object(
+            availability.reputation,
+            "adjust_completed_lessons",
+            side_effect=RuntimeError,
+        ):
+            with self.assertRaises(RuntimeError):
+                self.listing.save()
+
+        self.assertEqual(Listing.objects.get(pk=self.listing.pk).user, self.tutor)
+        booking.refresh_from_db()
+        self.assertEqual(booking.tutor, self.tutor)
+
+    def test_booking_moved_to_another_listing_follows_its_tutor(self):
+        booking = self.book(self.listing, 12, Booking.Status.COMPLETED)
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.listing = self.other_listing
+        booking.save()
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.tutor, self.other)
+        self.assertEqual(self.completed_lessons(), [("other", 1), ("tutor", 0)])
+
+    def test_owner_already_booked_at_that_time(self):
+        booking = self.book(self.listing, 10)
+        self.book(self.other_listing, 10)
+        self.listing.user = self.other
+
+        with self.assertRaises(ValidationError) as raised:
+            self.listing.full_clean()
+        self.assertIn("user", raised.exception.message_dict)
+
+        with self.assertRaises(availability.SlotTaken):
+            self.listing.save()
+        self.listing.refresh_from_db()
+        booking.refresh_from_db()
+        self.assertEqual(self.listing.user, self.tutor)
+        self.assertEqual(booking.tutor, self.tutor)
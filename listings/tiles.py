@@ -0,0 +1,42 @@
+"""
+Fragment cache for the listing tiles on the browse pages.
+
+Tiles are cached in ``TILE_CACHE`` under keys built on ``Listing.tile_scopes``,
+the listing's and its tutor's version stamps. Those are bumped by
+``Listing.invalidate_tile`` and ``Listing.invalidate_tutor_tiles``, so stale
+tiles are never read again and simply age out.
+
+The tiles of a page are handled together: one cache read for all their
+stamps, one for the tiles and one write for the tiles that had to be rendered.
+"""
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import TILE_CACHE
+
+
+def render_tiles(listings) -> list[str]:
+    """Rendered browse tiles of ``listings``, in order."""
+
+    listings = list(listings)
+    keys = TILE_CACHE.keys(
+        [((listing.pk,), listing.tile_scopes) for listing in listings]
+    )
+    found = TILE_CACHE.get_many(keys)
+    rendered = {
+        key: render_to_string("listing-tile.html", {"listing": listing})
+        for key, listing in zip(keys, listings)
+        if key not in found
+    }
+    TILE_CACHE.set_many(rendered, settings.LISTING_TILE_CACHE_TTL)
+    found.update(rendered)
+    return [
+        mark_safe(found[key])  # nosec B308 B703 - rendered by the template engine
+        for key in keys
+    ]
+
+
+def tile_cache_stats() -> dict:
+    return TILE_CACHE.stats()
@@ -1,22 +1,33 @@
-import calendar
-from datetime import date, datetime, time, timedelta
-from types import SimpleNamespace
+from datetime import date, datetime, timedelta
 
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Exists, Max, OuterRef
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView, ListView
 from django_filters.views import FilterView
 
-from .filters import ListingFilter
+from core.conditional import Freshness, conditional_page, latest
+from core.pagination import CursorPaginationMixin
+
+from . import availability, exports, tiles
+from .filters import BookingFilter, ListingFilter
 from .forms import AvailabilityForm, BookingForm, ListingCreationForm, ReviewForm
 from .models import Availability, Booking, Listing, Review
 
 
-class ListingListView(FilterView):
+SLOT_TAKEN_MESSAGE = (
+    "This time slot conflicts with an existing booking. Please choose a different time."
+)
+
+
+class ListingListView(CursorPaginationMixin, FilterView):
     template_name = "listings.html"
     model = Listing
     context_object_name = "listings"
@@ -27,13 +38,13 @@ class ListingListView(FilterView):
         return (
             super()
             .get_queryset()
-            .select_related("user")
+            .with_tutor_stats()
             .filter(type=Listing.ListingType.TUTOR, is_active=True)
-            .order_by("-created_at")
+            .order_by("-created_at", "-id")
         )
 
 
-class MentorListView(FilterView):
+class MentorListView(CursorPaginationMixin, FilterView):
     template_name = "mentor-list.html"
     model = Listing
     context_object_name = "listings"
@@ -44,9 +55,9 @@ class MentorListView(FilterView):
         return (
             super()
             .get_queryset()
-            .select_related("user")
+            .with_tutor_stats()
             .filter(type=Listing.ListingType.MENTOR, is_active=True)
-            .order_by("-created_at")
+            .order_by("-created_at", "-id")
         )
 
 
@@ -108,6 +119,73 @@ class CreateMentorListingView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+def _listing_state(listing_id, **filters):
+    """Timestamps of a listing, its tutor and the tutor's weekly availability."""
+
+    return (
+        Listing.objects.filter(pk=listing_id, **filters)
+        .annotate(
+            availability_count=Count("user__availabilities"),
+            availability_updated_at=Max("user__availabilities__updated_at"),
+        )
+        .values(
+            "updated_at",
+            "user_id",
+            "user__updated_at",
+            "user__rating_sum",
+            "user__rating_count",
+            "user__completed_lessons",
+            "availability_count",
+            "availability_updated_at",
+        )
+        .first()
+    )
+
+
+def listing_freshness(request, pk):
+    state = _listing_state(pk, is_active=True)
+    if state is None:
+        return None
+    return Freshness(
+        state.values(),
+        latest(
+            state["updated_at"],
+            state["user__updated_at"],
+            state["availability_updated_at"],
+        ),
+    )
+
+
+def available_slots_freshness(request, listing_id):
+    try:
+        selected_date = datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d")
+    except ValueError:
+        return None
+    selected_date = selected_date.date()
+    state = _listing_state(listing_id)
+    if state is None:
+        return None
+
+    # The slots depend on the bookings of every listing of the tutor.
+    bookings = Booking.objects.filter(
+        tutor_id=state["user_id"], date=selected_date
+    ).aggregate(count=Count("pk"), updated_at=Max("updated_at"))
+    validators = [selected_date, *state.values(), *bookings.values()]
+    last_modified = latest(
+        state["updated_at"],
+        state["availability_updated_at"],
+        bookings["updated_at"],
+    )
+
+    cutoff = availability.booking_cutoff()
+    if selected_date <= cutoff.date():
+        # Slots drop off as the booking cutoff moves through the day.
+        validators.append(availability.cutoff_minutes(selected_date, cutoff))
+        last_modified = None
+    return Freshness(validators, last_modified)
+
+
+@method_decorator(conditional_page(listing_freshness), name="get")
 class ListingDetailView(DetailView):
     model = Listing
     template_name = "listing-detail.html"
@@ -190,24 +268,65 @@ class DeleteAvailabilityView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
-class MyBookingsView(LoginRequiredMixin, ListView):
+def _reviewed_by(user):
+    return Exists(Review.objects.filter(booking=OuterRef("pk"), reviewer=user))
+
+
+class MyBookingsView(LoginRequiredMixin, FilterView):
     model = Booking
     template_name = "my-bookings.html"
     context_object_name = "bookings"
+    paginate_by = 20
+    filterset_class = BookingFilter
 
     def get_queryset(self):
-        bookings = (
-            Booking.objects.filter(listing__user=self.request.user)
+        return (
+            super()
+            .get_queryset()
+            .filter(listing__user=self.request.user)
             .select_related("student", "listing")
-            .prefetch_related("reviews")
+            .annotate(user_has_reviewed=_reviewed_by(self.request.user))
         )
 
-        for booking in bookings:
-            booking.user_has_reviewed = booking.reviews.filter(
-                reviewer=self.request.user
-            ).exists()
 
-        return bookings
+class BookingExportView(LoginRequiredMixin, View):
+    """Stream the bookings matching ``BookingFilter`` as CSV or NDJSON.
+
+    ``scope`` picks the bookings on offer: the tutor's lessons for
+    ``"tutor"``, the student's bookings for ``"student"`` and, to staff only,
+    every booking for ``"all"``.
+    """
+
+    scope = None
+    export_names = {
+        "tutor": "tutor-bookings",
+        "student": "student-bookings",
+        "all": "all-bookings",
+    }
+
+    def get_queryset(self):
+        if self.scope == "tutor":
+            return Booking.objects.filter(listing__user=self.request.user)
+        if self.scope == "student":
+            return Booking.objects.filter(student=self.request.user)
+        if self.scope == "all":
+            return Booking.objects.all()
+        raise ImproperlyConfigured(f"Unknown booking export scope {self.scope!r}")
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.scope == "all":
+            return staff_member_required(super().dispatch)(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        filterset = BookingFilter(request.GET, queryset=self.get_queryset())
+        if not filterset.is_valid():
+            return HttpResponseBadRequest("Invalid export filter.")
+        return exports.export_bookings(
+            filterset.qs,
+            request.GET.get("format", "csv"),
+            self.export_names[self.scope],
+        )
 
 
 class UpdateBookingStatusView(LoginRequiredMixin, View):
@@ -247,16 +366,23 @@ class UpdateBookingStatusView(LoginRequiredMixin, View):
             elif is_student:
                 booking.student_marked_complete = False
 
-            if booking.status == Booking.Status.COMPLETED:
-                booking.status = Booking.Status.CONFIRMED
-
-            booking.save()
-            messages.success(request, "Completion mark removed.")
+            try:
+                if booking.status == Booking.Status.COMPLETED:
+                    availability.set_booking_status(booking, Booking.Status.CONFIRMED)
+                else:
+                    booking.save()
+            except availability.SlotTaken:
+                messages.error(request, SLOT_TAKEN_MESSAGE)
+            else:
+                messages.success(request, "Completion mark removed.")
 
         elif status in dict(Booking.Status.choices):
-            booking.status = status
-            booking.save()
-            messages.success(request, f"Booking {status}.")
+            try:
+                availability.set_booking_status(booking, status)
+            except availability.SlotTaken:
+                messages.error(request, SLOT_TAKEN_MESSAGE)
+            else:
+                messages.success(request, f"Booking {status}.")
 
         if is_tutor:
             return redirect("my-bookings")
@@ -271,7 +397,9 @@ class CreateBookingView(LoginRequiredMixin, CreateView):
 
     def get_listing(self):
         if not hasattr(self, "_listing"):
-            self._listing = get_object_or_404(Listing, pk=self.kwargs["listing_id"])
+            self._listing = get_object_or_404(
+                Listing.objects.select_related("user"), pk=self.kwargs["listing_id"]
+            )
         return self._listing
 
     def get_form_kwargs(self):
@@ -292,60 +420,19 @@ class CreateBookingView(LoginRequiredMixin, CreateView):
         context["current_month"] = month
 
         # Calculate availability counts for each day in the month
-        availability_counts = {}
-        _, num_days = calendar.monthrange(year, month)
-
-        for day in range(1, num_days + 1):
-            check_date = date(year, month, day)
-            if check_date >= today:  # Only check future dates
-                slot_count = self._count_available_slots(listing, check_date)
-                availability_counts[day] = slot_count
-
-        context["availability_counts"] = availability_counts
-        return context
-
-    def _count_available_slots(self, listing, check_date):
-        """Count available time slots for a given date"""
-        day_of_week = check_date.weekday()
-        availabilities = listing.user.availabilities.filter(
-            day_of_week=day_of_week, is_active=True
+        month_slots = availability.get_month_slots(
+            listing, year, month, availability.booking_cutoff(), start=today
         )
-
-        if not availabilities.exists():
-            default_availability = SimpleNamespace(
-                start_time=time(6, 0), end_time=time(23, 0)
-            )
-            availabilities = [default_availability]
-
-        existing_bookings = Booking.objects.filter(
-            listing=listing,
-            date=check_date,
-            status__in=[Booking.Status.PENDING, Booking.Status.CONFIRMED],
-        ).values_list("start_time", "end_time")
-
-        slot_count = 0
-        for availability in availabilities:
-            current_time = datetime.combine(check_date, availability.start_time)
-            end_time = datetime.combine(check_date, availability.end_time)
-
-            while current_time < end_time:
-                is_available = True
-                slot_end = current_time + timedelta(hours=1)
-
-                for booking_start, booking_end in existing_bookings:
-                    booking_start_dt = datetime.combine(check_date, booking_start)
-                    booking_end_dt = datetime.combine(check_date, booking_end)
-
-                    if current_time < booking_end_dt and slot_end > booking_start_dt:
-                        is_available = False
-                        break
-
-                if is_available:
-                    slot_count += 1
-
-                current_time += timedelta(hours=1)
-
-        return slot_count
+        context["availability_counts"] = {
+            day.day: sum(1 for slot in slots if slot.is_available)
+            for day, slots in month_slots.items()
+        }
+        # The slots themselves, so booking.js can show a day without a request.
+        context["month_slots"] = {
+            day.isoformat(): [slot.as_dict() for slot in slots]
+            for day, slots in month_slots.items()
+        }
+        return context
 
     def form_valid(self, form):
         form.instance.listing = self.get_listing()
@@ -358,56 +445,42 @@ class CreateBookingView(LoginRequiredMixin, CreateView):
         duration_hours = 1
         form.instance.duration_hours = duration_hours
 
-        start_dt = datetime.combine(datetime.today(), start_time)
+        start_dt = datetime.combine(booking_date, start_time)
         end_dt = start_dt + timedelta(hours=duration_hours)
         form.instance.end_time = end_dt.time()
 
-        conflicting_bookings = Booking.objects.filter(
-            listing=self.get_listing(),
-            date=booking_date,
-            status__in=[Booking.Status.PENDING, Booking.Status.CONFIRMED],
-        )
-
-        for booking in conflicting_bookings:
-            booking_start = datetime.combine(booking_date, booking.start_time)
-            booking_end = datetime.combine(booking_date, booking.end_time)
-            new_start = datetime.combine(booking_date, start_time)
-            new_end = datetime.combine(booking_date, form.instance.end_time)
-
-            if new_start < booking_end and new_end > booking_start:
-                messages.error(
-                    self.request,
-                    "This time slot conflicts with an existing booking. Please choose a different time.",
-                )
-                return self.form_invalid(form)
+        try:
+            availability.create_booking(form.instance)
+        except availability.SlotTaken:
+            messages.error(self.request, SLOT_TAKEN_MESSAGE)
+            return self.form_invalid(form)
 
+        self.object = form.instance
         messages.success(self.request, "Booking request submitted successfully!")
-        return super().form_valid(form)
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse("student-bookings")
 
 
-class StudentBookingsView(LoginRequiredMixin, ListView):
+class StudentBookingsView(LoginRequiredMixin, FilterView):
     model = Booking
     template_name = "student-bookings.html"
     context_object_name = "bookings"
+    paginate_by = 20
+    filterset_class = BookingFilter
 
     def get_queryset(self):
-        bookings = (
-            Booking.objects.filter(student=self.request.user)
+        return (
+            super()
+            .get_queryset()
+            .filter(student=self.request.user)
             .select_related("listing", "listing__user")
-            .prefetch_related("reviews")
+            .annotate(user_has_reviewed=_reviewed_by(self.request.user))
         )
 
-        for booking in bookings:
-            booking.user_has_reviewed = booking.reviews.filter(
-                reviewer=self.request.user
-            ).exists()
-
-        return bookings
-
 
+@conditional_page(available_slots_freshness, per_viewer=False)
 def get_available_slots(request, listing_id):
     date_str = request.GET.get("date")
     if not date_str:
@@ -418,73 +491,17 @@ def get_available_slots(request, listing_id):
     except ValueError:
         return JsonResponse({"slots": []})
 
-    listing = get_object_or_404(Listing, pk=listing_id)
-    day_of_week = selected_date.weekday()
-
-    availabilities = listing.user.availabilities.filter(
-        day_of_week=day_of_week, is_active=True
+    listing = get_object_or_404(Listing.objects.select_related("user"), pk=listing_id)
+    slots = availability.get_available_slots(
+        listing, selected_date, availability.booking_cutoff()
     )
 
-    if not availabilities.exists():
-        default_availability = SimpleNamespace(
-            start_time=time(6, 0), end_time=time(23, 0)
-        )
-        availabilities = [default_availability]
-
-    existing_bookings = Booking.objects.filter(
-        listing=listing,
-        date=selected_date,
-        status__in=[Booking.Status.PENDING, Booking.Status.CONFIRMED],
-    ).values_list("start_time", "end_time")
-
-    from django.utils import timezone
-
-    now = timezone.now()
-    now_local = timezone.localtime(now)
-    booking_cutoff_local = now_local + timedelta(minutes=10)
-
-    all_slots = []
-    for availability in availabilities:
-        current_time = datetime.combine(selected_date, availability.start_time)
-        end_time = datetime.combine(selected_date, availability.end_time)
-
-        while current_time < end_time:
-            time_value = current_time.time()
-            is_available = True
-
-            slot_datetime_naive = datetime.combine(selected_date, time_value)
-            slot_datetime_aware = timezone.make_aware(slot_datetime_naive)
-            slot_datetime_local = timezone.localtime(slot_datetime_aware)
-
-            if slot_datetime_local < booking_cutoff_local:
-                current_time += timedelta(hours=1)
-                continue
-
-            slot_end = current_time + timedelta(hours=1)
-
-            for booking_start, booking_end in existing_bookings:
-                booking_start_dt = datetime.combine(selected_date, booking_start)
-                booking_end_dt = datetime.combine(selected_date, booking_end)
-
-                if current_time < booking_end_dt and slot_end > booking_start_dt:
-                    is_available = False
-                    break
-
-            hour = current_time.hour
-            minute = current_time.minute
-            display = f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
-
-            all_slots.append(
-                {
-                    "value": time_value.strftime("%H:%M"),
-                    "display": display,
-                    "is_available": is_available,
-                }
-            )
+    return JsonResponse({"slots": [slot.as_dict() for slot in slots]})
 
-            current_time += timedelta(hours=1)
 
-    return JsonResponse({"slots": all_slots})
+@staff_member_required
+def tile_cache_stats(request):
+    return JsonResponse(tiles.tile_cache_stats())
 
 
 class CreateReviewView(LoginRequiredMixin, View):
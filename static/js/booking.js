@@ -5,6 +5,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const submitButton = document.getElementById('submit-booking');
     const timeLabel = document.getElementById('time-label');
     const listingId = document.getElementById('listing-id').value;
+    // Slots of every remaining day of the month, rendered into the page.
+    const monthSlots = JSON.parse(document.getElementById('month-slots').textContent);
 
     initializeTimeSlots();
 
@@ -53,37 +55,56 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function fetchAvailableSlots(date) {
+        // Show the slots from the page straight away, then refresh them:
+        // other students may have booked since. The endpoint answers with
+        // 304 Not Modified while nothing changed.
+        if (monthSlots[date]) {
+            renderSlots(monthSlots[date]);
+        }
+
         fetch(`/listings/${listingId}/available-slots/?date=${date}`)
             .then(response => response.json())
             .then(data => {
-                const buttons = timeSlotsContainer.querySelectorAll('.time-slot-btn');
-
-                buttons.forEach(btn => {
-                    const slot = data.slots.find(s => s.value === btn.dataset.value);
-
-                    if (slot) {
-                        btn.disabled = !slot.is_available;
-                        btn.className = slot.is_available ? 'time-slot-btn' : 'time-slot-btn booked';
-
-                        if (slot.is_available && !btn.hasAttribute('data-initialized')) {
-                            btn.setAttribute('data-initialized', 'true');
-                            btn.addEventListener('click', function() {
-                                buttons.forEach(b => b.classList.remove('selected'));
-                                this.classList.add('selected');
-                                hiddenTimeInput.value = this.dataset.value;
-                                submitButton.disabled = false;
-                            });
-                        }
-                    } else {
-                        btn.disabled = true;
-                        btn.className = 'time-slot-btn booked';
-                    }
-
-                    btn.classList.remove('selected');
-                });
+                monthSlots[date] = data.slots;
+                if (hiddenDateInput.value === date) {
+                    renderSlots(data.slots);
+                }
             })
             .catch(error => {
                 console.error('Error fetching time slots:', error);
             });
     }
+
+    function renderSlots(slots) {
+        const buttons = timeSlotsContainer.querySelectorAll('.time-slot-btn');
+        const selectedTime = hiddenTimeInput.value;
+        if (selectedTime && !slots.some(s => s.value === selectedTime && s.is_available)) {
+            hiddenTimeInput.value = '';
+            submitButton.disabled = true;
+        }
+
+        buttons.forEach(btn => {
+            const slot = slots.find(s => s.value === btn.dataset.value);
+
+            if (slot) {
+                btn.disabled = !slot.is_available;
+                btn.className = slot.is_available ? 'time-slot-btn' : 'time-slot-btn booked';
+
+                if (slot.is_available && !btn.hasAttribute('data-initialized')) {
+                    btn.setAttribute('data-initialized', 'true');
+                    btn.addEventListener('click', function() {
+                        buttons.forEach(b => b.classList.remove('selected'));
+                        this.classList.add('selected');
+                        hiddenTimeInput.value = this.dataset.value;
+                        submitButton.disabled = false;
+                    });
+                }
+            } else {
+                btn.disabled = true;
+                btn.className = 'time-slot-btn booked';
+            }
+
+            btn.classList.toggle('selected', btn.dataset.value === hiddenTimeInput.value);
+        });
+    }
 });
\ No newline at end of file
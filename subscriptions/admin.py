@@ -1,6 +1,17 @@
 from django.contrib import admin
 
+from users.admin import AccountSearchMixin
+
 from .models import Plan, Subscription
 
 admin.site.register(Plan)
-admin.site.register(Subscription)
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(AccountSearchMixin, admin.ModelAdmin):
+    list_display = ("id", "user", "plan", "is_active", "started_at", "expires_at")
+    list_filter = ("plan", "is_active")
+    list_select_related = ("user", "plan")
+    autocomplete_fields = ("user",)
+    show_full_result_count = False
+    account_search_fields = ("user",)
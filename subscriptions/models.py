@@ -2,6 +2,10 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from core.cache import Namespace
+
+PLAN_CACHE = Namespace("plans")
+
 
 class Plan(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -19,6 +23,14 @@ class Plan(models.Model):
         return self.name
 
 
+def get_plans() -> list[Plan]:
+    """All plans by level, cached until a plan is saved or deleted."""
+
+    return PLAN_CACHE.get_or_set(
+        PLAN_CACHE.key("all"), lambda: list(Plan.objects.order_by("level")), None
+    )
+
+
 class Subscription(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="subscription"
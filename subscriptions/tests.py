@@ -1 +1,21 @@
-# Create your tests here.
+from django.test import TestCase
+
+from core.testing import ChangelistQueryMixin
+from users.models import Account
+
+from .models import Plan, Subscription
+
+
+class AdminChangelistQueryTests(ChangelistQueryMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        plans = [
+            Plan.objects.create(name=name, level=level)
+            for level, name in enumerate(("Student", "Tutor"), start=1)
+        ]
+        for i in range(5):
+            user = Account.objects.create_user(f"user{i}")
+            Subscription.objects.create(user=user, plan=plans[i % 2])
+
+    def test_subscription_changelist(self):
+        self.assertChangelistQueries(Subscription, 5)
@@ -10,7 +10,7 @@ from django.views.generic import TemplateView
 
 from users.models import Account
 
-from .models import Plan, Subscription
+from .models import Plan, Subscription, get_plans
 
 
 class PricingView(TemplateView):
@@ -18,7 +18,7 @@ class PricingView(TemplateView):
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        ctx["plans"] = Plan.objects.order_by("level")
+        ctx["plans"] = get_plans()
         user = self.request.user
         ctx["current_plan_level"] = (
             getattr(user, "role_level", None) if user.is_authenticated else None
@@ -37,7 +37,7 @@ class ChangePlanView(LoginRequiredMixin, View):
 
         with transaction.atomic():
             acc.role_level = plan.level
-            acc.save(update_fields=["role_level"])
+            acc.save(update_fields=["role_level", "updated_at"])
 
             sub, _ = Subscription.objects.select_for_update().get_or_create(
                 user=acc, defaults={"plan": plan}
@@ -1,16 +1,60 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q
 
 from .models import Account
 
 
+class AccountSearchMixin:
+    """Changelist search by the exact username of related accounts.
+
+    Each of ``account_search_fields`` is matched against an indexed username
+    subquery instead of a join, so an OR over several of them is still served
+    by the foreign key indexes.
+    """
+
+    account_search_fields: tuple[str, ...] = ()
+
+    def get_search_fields(self, request):
+        return [f"{field}__username__exact" for field in self.account_search_fields]
+
+    def get_search_results(self, request, queryset, search_term):
+        username = search_term.strip()
+        if not username:
+            return queryset, False
+        accounts = Account.objects.filter(username=username).values("pk")
+        return (
+            queryset.filter(
+                Q.create(
+                    [
+                        (f"{field}__in", accounts)
+                        for field in self.account_search_fields
+                    ],
+                    connector=Q.OR,
+                )
+            ),
+            False,
+        )
+
+
 class AccountAdmin(UserAdmin):
     list_display = ("username", "email", "role", "is_staff", "is_superuser")
     list_filter = ("role_level", "is_staff", "is_superuser", "is_active")
     fieldsets = (
         (None, {"fields": ("username", "password")}),
         ("Personal info", {"fields": ("email", "first_name", "last_name")}),
-        ("Permissions", {"fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions")}),
+        (
+            "Permissions",
+            {
+                "fields": (
+                    "is_active",
+                    "is_staff",
+                    "is_superuser",
+                    "groups",
+                    "user_permissions",
+                )
+            },
+        ),
         ("Role", {"fields": ("role_level",)}),
         ("Important dates", {"fields": ("last_login", "date_joined")}),
     )
@@ -23,8 +67,11 @@ class AccountAdmin(UserAdmin):
             },
         ),
     )
-    search_fields = ("username", "email")
+    # Also used by the autocomplete widgets, so usernames match by prefix.
+    # Both lookups are backed by the indexes of migration 0006.
+    search_fields = ("username__istartswith", "email__iexact")
     ordering = ("username",)
+    show_full_result_count = False
 
 
 admin.site.register(Account, AccountAdmin)
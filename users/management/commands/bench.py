@@ -0,0 +1,229 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.querybudget import count_queries
+from listings.models import Booking, Listing
+from users.models import Account
+
+ENDPOINTS = (
+    "home",
+    "listings",
+    "mentors",
+    "jobs",
+    "listing-detail",
+    "create-booking",
+    "available-slots",
+    "profile",
+    "my-bookings",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot endpoints against the current (seeded) database and "
+        "compare the results with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Untimed requests per endpoint before measuring.",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=ENDPOINTS,
+            help="Only benchmark this endpoint; may be repeated.",
+        )
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument("--output", default="bench-results.json")
+        parser.add_argument("--baseline", help="Results file to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Percent slowdown of p50/p95 reported as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(Path(options["baseline"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+
+        targets = self.targets()
+        results = {}
+        for name in options["endpoint"] or ENDPOINTS:
+            url, user = targets[name]
+            results[name] = self.measure(url, user, options)
+            self.stdout.write(self.format_row(name, results[name]))
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "iterations": options["iterations"],
+                "cold_cache": options["cold_cache"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "rows": {
+                    "accounts": Account.objects.count(),
+                    "listings": Listing.objects.count(),
+                    "bookings": Booking.objects.count(),
+                },
+            },
+            "endpoints": results,
+        }
+        Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = self.compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regression(s) against {options['baseline']}."
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def targets(self) -> dict[str, tuple[str, Account | None]]:
+        """URL and logged-in user for every endpoint, picked from the data."""
+
+        listing = (
+            Listing.objects.filter(is_active=True, type=Listing.ListingType.TUTOR)
+            .annotate(booking_count=Count("bookings"))
+            .order_by("-booking_count", "pk")
+            .select_related("user")
+            .first()
+        )
+        if listing is None:
+            raise CommandError(
+                "No active listings to benchmark; run seed_marketplace first."
+            )
+        tutor = listing.user
+        student = (
+            Account.objects.exclude(pk=tutor.pk)
+            .annotate(
+                booking_count=Count("bookings", filter=Q(bookings__listing__user=tutor))
+            )
+            .order_by("-booking_count", "pk")
+            .first()
+        )
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        return {
+            "home": (reverse("home"), None),
+            "listings": (reverse("listings"), None),
+            "mentors": (reverse("mentors"), None),
+            "jobs": (reverse("jobs"), None),
+            "listing-detail": (reverse("listing-detail", args=[listing.pk]), None),
+            "create-booking": (reverse("create-booking", args=[listing.pk]), student),
+            "available-slots": (
+                f"{reverse('available-slots', args=[listing.pk])}?date={tomorrow}",
+                None,
+            ),
+            "profile": (reverse("profile"), tutor),
+            "my-bookings": (reverse("my-bookings"), tutor),
+        }
+
+    def measure(self, url: str, user, options) -> dict:
+        # The client would otherwise send Host: testserver, which is not in
+        # ALLOWED_HOSTS outside the test runner.
+        client = Client(HTTP_HOST="127.0.0.1")
+        if user is not None:
+            client.force_login(user)
+
+        for _ in range(options["warmup"]):
+            self.request(client, url, options["cold_cache"])
+
+        timings, queries = [], []
+        status = None
+        for _ in range(options["iterations"]):
+            start = time.perf_counter()
+            with count_queries() as counter:
+                status = self.request(client, url, options["cold_cache"])
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(counter.count)
+
+        # Allocation tracing slows requests down, so it gets its own run.
+        tracemalloc.start()
+        try:
+            self.request(client, url, options["cold_cache"])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "url": url,
+            "status": status,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": max(queries),
+            "peak_alloc_kb": round(peak / 1024, 1),
+        }
+
+    def request(self, client, url: str, cold_cache: bool) -> int:
+        if cold_cache:
+            cache.clear()
+        response = client.get(url)
+        # Streaming responses only do their work once consumed.
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def format_row(self, name: str, result: dict) -> str:
+        return (
+            f"{name:<16} {result['status']:>3}  "
+            f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+            f"{result['queries']:>3} queries  {result['peak_alloc_kb']:>8.1f} KiB"
+        )
+
+    def compare(self, results: dict, baseline: dict, threshold: float) -> list[str]:
+        regressions = []
+        limit = 1 + threshold / 100
+        for name, result in results.items():
+            before = baseline.get("endpoints", {}).get(name)
+            if before is None:
+                continue
+            problems = [
+                f"{metric} {before[metric]:.2f} -> {result[metric]:.2f} ms"
+                for metric in ("p50_ms", "p95_ms")
+                if before[metric] and result[metric] > before[metric] * limit
+            ]
+            if result["queries"] > before["queries"]:
+                problems.append(f"queries {before['queries']} -> {result['queries']}")
+            if problems:
+                regressions.append(name)
+                self.stdout.write(
+                    self.style.ERROR(f"REGRESSION {name}: {'; '.join(problems)}")
+                )
+        return regressions
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
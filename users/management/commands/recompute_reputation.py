@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from users.models import Account
+from users.reputation import expected_reputation
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized rating and lesson counters on accounts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of accounts written per UPDATE batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many accounts have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        drifted = (
+            Account.objects.annotate(**expected_reputation())
+            .exclude(
+                rating_sum=F("expected_rating_sum"),
+                rating_count=F("expected_rating_count"),
+                completed_lessons=F("expected_completed_lessons"),
+            )
+            .order_by("pk")
+            .values_list(
+                "pk",
+                "expected_rating_sum",
+                "expected_rating_count",
+                "expected_completed_lessons",
+            )
+        )
+
+        fixed = 0
+        batch = []
+        for pk, rating_sum, rating_count, completed_lessons in drifted.iterator(
+            chunk_size=batch_size
+        ):
+            batch.append(
+                Account(
+                    pk=pk,
+                    rating_sum=rating_sum,
+                    rating_count=rating_count,
+                    completed_lessons=completed_lessons,
+                )
+            )
+            if len(batch) >= batch_size:
+                fixed += self._write(batch, options["dry_run"])
+                batch = []
+        fixed += self._write(batch, options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {fixed} account(s) with drifted counters.")
+        )
+
+    def _write(self, batch, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                Account.objects.bulk_update(
+                    batch, ["rating_sum", "rating_count", "completed_lessons"]
+                )
+        return len(batch)
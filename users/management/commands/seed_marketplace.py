@@ -0,0 +1,406 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.stats import invalidate_marketplace_stats
+from jobs.models import Job, Proposal
+from listings.models import TILE_CACHE, Availability, Booking, Listing, Review
+from subscriptions.models import Plan, Subscription
+from users.models import Account
+
+# Every seeded account can log in with this password.
+PASSWORD = "marketplace"
+
+ROLE_WEIGHTS = {
+    Account.Role.STUDENT: 55,
+    Account.Role.TUTOR: 20,
+    Account.Role.FREELANCER: 15,
+    Account.Role.MENTOR: 10,
+}
+
+FIRST_NAMES = (
+    "Ada Alan Amara Ben Carla Chen Dana Diego Elena Farah Grace Hiro Ines Jonas "
+    "Kemal Lena Marek Nadia Omar Priya Quinn Rosa Sami Tara Uma Victor Wen Yara Zoe"
+).split()
+LAST_NAMES = (
+    "Ahmed Bauer Costa Dubois Evans Fischer Garcia Hansen Ito Jensen Kowalski "
+    "Lopez Moreau Novak Okafor Petrov Rossi Silva Tanaka Usman Varga Weber "
+    "Yilmaz Zhang"
+).split()
+SUBJECTS = {
+    "Python": "Programming",
+    "JavaScript": "Programming",
+    "TypeScript": "Programming",
+    "Go": "Programming",
+    "Rust": "Programming",
+    "Django": "Web Development",
+    "React": "Web Development",
+    "SQL": "Databases",
+    "PostgreSQL": "Databases",
+    "Algorithms": "Computer Science",
+    "Data Structures": "Computer Science",
+    "Machine Learning": "Data Science",
+    "Pandas": "Data Science",
+    "Docker": "DevOps",
+    "Kubernetes": "DevOps",
+}
+LEVELS = ("Beginner", "Intermediate", "Advanced", "Interview prep")
+REVIEW_RATINGS = {5: 50, 4: 30, 3: 12, 2: 5, 1: 3}
+REVIEW_COMMENTS = (
+    "Clear explanations and well prepared.",
+    "Helped me get unstuck quickly.",
+    "Good session, a bit rushed at the end.",
+    "Very patient and knowledgeable.",
+    "Not quite what I was looking for.",
+    "Great examples, will book again.",
+)
+PAST_STATUSES = {
+    Booking.Status.COMPLETED: 75,
+    Booking.Status.CANCELLED: 25,
+}
+UPCOMING_STATUSES = {
+    Booking.Status.PENDING: 40,
+    Booking.Status.CONFIRMED: 45,
+    Booking.Status.CANCELLED: 15,
+}
+JOB_STATUSES = {
+    Job.Status.OPEN: 50,
+    Job.Status.IN_PROGRESS: 25,
+    Job.Status.CLOSED: 20,
+    Job.Status.CANCELLED: 5,
+}
+
+# Bookings fall between this many days ago and this many days ahead.
+HISTORY_DAYS = 365
+HORIZON_DAYS = 60
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic synthetic marketplace dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--listings", type=int, default=300)
+        parser.add_argument("--bookings", type=int, default=5000)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed always builds the same dataset.",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            default=None,
+            help="Date (YYYY-MM-DD) all generated dates are relative to.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows written per INSERT batch.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.today = options["today"] or timezone.localdate()
+        self.now = timezone.make_aware(datetime.combine(self.today, time(12)))
+        self.prefix = f"seed{options['seed']}-"
+
+        if Account.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f"Accounts for seed {options['seed']} already exist; "
+                "use another --seed or a fresh database."
+            )
+
+        with transaction.atomic():
+            plans = self.seed_plans()
+            users = self.seed_accounts(options["users"])
+            self.seed_subscriptions(users, plans)
+            tutors = [pk for pk, role in users if role >= Account.Role.TUTOR]
+            if not tutors:
+                raise CommandError("No tutor accounts generated; raise --users.")
+            windows = self.seed_availability(tutors)
+            listings = self.seed_listings(options["listings"], users)
+            bookings = self.seed_bookings(options["bookings"], users, listings, windows)
+            jobs = self.seed_jobs(users)
+
+        call_command(
+            "recompute_reputation", batch_size=self.batch_size, stdout=self.stdout
+        )
+        invalidate_marketplace_stats()
+        TILE_CACHE.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(users)} accounts, {len(listings)} listings, "
+                f"{bookings} bookings and {jobs} jobs."
+            )
+        )
+
+    # Helpers ----------------------------------------------------------------
+
+    def choose(self, weights: dict):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def moment(self, days_back: int) -> datetime:
+        """A random datetime up to ``days_back`` days before the anchor date."""
+
+        return self.now - timedelta(seconds=self.random.randint(0, days_back * 86400))
+
+    def insert(self, model, objects) -> list:
+        """``bulk_create`` ``objects`` in batches and return the created rows."""
+
+        created, batch = [], []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            created += model.objects.bulk_create(batch)
+        return created
+
+    # Seeders ----------------------------------------------------------------
+
+    def seed_plans(self) -> dict[int, Plan]:
+        if not Plan.objects.exists():
+            call_command("loaddata", "plans", verbosity=0)
+        return {plan.level: plan for plan in Plan.objects.all()}
+
+    def seed_accounts(self, count: int) -> list[tuple[int, int]]:
+        password = make_password(PASSWORD)
+
+        def accounts():
+            for i in range(count):
+                first = self.random.choice(FIRST_NAMES)
+                last = self.random.choice(LAST_NAMES)
+                username = f"{self.prefix}{first.lower()}{i}"
+                yield Account(
+                    username=username,
+                    email=f"{username}@example.com",
+                    first_name=first,
+                    last_name=last,
+                    password=password,
+                    role_level=self.choose(ROLE_WEIGHTS),
+                    date_joined=self.moment(2 * HISTORY_DAYS),
+                )
+
+        return [(user.pk, user.role_level) for user in self.insert(Account, accounts())]
+
+    def seed_subscriptions(self, users, plans) -> None:
+        self.insert(
+            Subscription,
+            (
+                Subscription(
+                    user_id=pk, plan=plans[role], started_at=self.moment(HISTORY_DAYS)
+                )
+                for pk, role in users
+                if role in plans
+            ),
+        )
+
+    def seed_availability(self, tutors) -> dict[int, dict[int, tuple[int, int]]]:
+        """Weekly windows per tutor, returned as ``{tutor: {weekday: (start, end)}}``."""
+
+        windows = {}
+        rows = []
+        for tutor in tutors:
+            days = self.random.sample(range(7), self.random.randint(2, 6))
+            windows[tutor] = {}
+            for day in days:
+                start = self.random.randint(7, 14)
+                end = min(start + self.random.randint(3, 8), 22)
+                windows[tutor][day] = (start, end)
+                rows.append(
+                    Availability(
+                        user_id=tutor,
+                        day_of_week=day,
+                        start_time=time(start),
+                        end_time=time(end),
+                    )
+                )
+        self.insert(Availability, rows)
+        return windows
+
+    def seed_listings(self, count: int, users) -> list[tuple[int, int]]:
+        owners = [(pk, role) for pk, role in users if role >= Account.Role.TUTOR]
+        subjects = list(SUBJECTS)
+
+        def listings():
+            for _ in range(count):
+                owner, role = self.random.choice(owners)
+                mentor = role >= Account.Role.MENTOR and self.random.random() < 0.5
+                subject = self.random.choice(subjects)
+                level = self.random.choice(LEVELS)
+                kind = "mentoring" if mentor else "tutoring"
+                yield Listing(
+                    user_id=owner,
+                    type=Listing.ListingType.MENTOR
+                    if mentor
+                    else Listing.ListingType.TUTOR,
+                    title=f"{level} {subject} {kind}",
+                    description=(
+                        f"One-to-one {subject} {kind} for {level.lower()} learners, "
+                        f"covering {SUBJECTS[subject].lower()} fundamentals and "
+                        "hands-on exercises."
+                    ),
+                    price=Decimal(self.random.randrange(15, 121)),
+                    subject=subject,
+                    category=SUBJECTS[subject],
+                    is_active=self.random.random() < 0.92,
+                    created_at=self.moment(HISTORY_DAYS),
+                )
+
+        return [
+            (listing.pk, listing.user_id)
+            for listing in self.insert(Listing, listings())
+        ]
+
+    def seed_bookings(self, count: int, users, listings, windows) -> int:
+        """Insert bookings in batches, reviewing some of the completed ones.
+
+        Active (pending/confirmed) bookings never overlap for the same tutor;
+        a clashing draw is recorded as cancelled instead.
+        """
+
+        if not listings:
+            return 0
+        student_ids = [pk for pk, _ in users]
+        taken = set()
+
+        def bookings():
+            for _ in range(count):
+                listing_id, tutor_id = self.random.choice(listings)
+                index = self.random.randrange(len(student_ids))
+                if student_ids[index] == tutor_id:
+                    index = (index + 1) % len(student_ids)
+                student_id = student_ids[index]
+                day = self.today + timedelta(
+                    days=self.random.randint(-HISTORY_DAYS, HORIZON_DAYS)
+                )
+                start, end = windows[tutor_id].get(day.weekday(), (6, 23))
+                hour = self.random.randrange(start, end)
+                if day < self.today:
+                    status = self.choose(PAST_STATUSES)
+                else:
+                    status = self.choose(UPCOMING_STATUSES)
+                if status in (Booking.Status.PENDING, Booking.Status.CONFIRMED):
+                    if (tutor_id, day, hour) in taken:
+                        status = Booking.Status.CANCELLED
+                    else:
+                        taken.add((tutor_id, day, hour))
+                completed = status == Booking.Status.COMPLETED
+                booked_at = timezone.make_aware(datetime.combine(day, time(hour)))
+                yield Booking(
+                    listing_id=listing_id,
+                    tutor_id=tutor_id,
+                    student_id=student_id,
+                    date=day,
+                    start_time=time(hour),
+                    end_time=time(hour + 1),
+                    duration_hours=1,
+                    status=status,
+                    tutor_marked_complete=completed,
+                    student_marked_complete=completed,
+                    created_at=min(
+                        booked_at - timedelta(days=self.random.randint(1, 30)), self.now
+                    ),
+                )
+
+        total, batch = 0, []
+        for booking in bookings():
+            batch.append(booking)
+            if len(batch) >= self.batch_size:
+                total += self._write_bookings(batch)
+                batch = []
+        total += self._write_bookings(batch)
+        return total
+
+    def _write_bookings(self, batch) -> int:
+        if not batch:
+            return 0
+        reviews = []
+        for booking in Booking.objects.bulk_create(batch):
+            if booking.status != Booking.Status.COMPLETED:
+                continue
+            tutor_id = booking.tutor_id
+            reviewed_at = timezone.make_aware(
+                datetime.combine(booking.date, booking.end_time)
+            ) + timedelta(hours=self.random.randint(1, 72))
+            if self.random.random() < 0.6:
+                reviews.append(
+                    self._review(booking, booking.student_id, tutor_id, reviewed_at)
+                )
+            if self.random.random() < 0.3:
+                reviews.append(
+                    self._review(booking, tutor_id, booking.student_id, reviewed_at)
+                )
+        Review.objects.bulk_create(reviews)
+        return len(batch)
+
+    def _review(self, booking, reviewer_id, reviewed_id, created_at) -> Review:
+        return Review(
+            reviewer_id=reviewer_id,
+            reviewed_user_id=reviewed_id,
+            booking=booking,
+            rating=self.choose(REVIEW_RATINGS),
+            comment=self.random.choice(REVIEW_COMMENTS),
+            created_at=min(created_at, self.now),
+        )
+
+    def seed_jobs(self, users) -> int:
+        freelancers = [pk for pk, role in users if role >= Account.Role.FREELANCER]
+        subjects = list(SUBJECTS)
+
+        def jobs():
+            for _ in range(max(len(users) // 4, 1)):
+                subject = self.random.choice(subjects)
+                yield Job(
+                    user_id=self.random.choice(users)[0],
+                    title=f"Need help with {subject}",
+                    description=(
+                        f"Looking for someone experienced in {subject} to help "
+                        "with a small project."
+                    ),
+                    budget=Decimal(self.random.randrange(50, 2001, 25)),
+                    subject=subject,
+                    status=self.choose(JOB_STATUSES),
+                    created_at=self.moment(HISTORY_DAYS),
+                )
+
+        created = self.insert(Job, jobs())
+
+        def proposals():
+            for job in created:
+                wanted = self.random.randint(0, 5)
+                drawn = self.random.sample(
+                    freelancers, min(len(freelancers), wanted + 1)
+                )
+                bidders = [pk for pk in drawn if pk != job.user_id][:wanted]
+                accepted = (
+                    bidders[0] if bidders and job.status != Job.Status.OPEN else None
+                )
+                for bidder in bidders:
+                    yield Proposal(
+                        job=job,
+                        user_id=bidder,
+                        message="I can help with this.",
+                        price=job.budget,
+                        is_accepted=bidder == accepted,
+                        created_at=min(
+                            job.created_at
+                            + timedelta(hours=self.random.randint(1, 96)),
+                            self.now,
+                        ),
+                    )
+
+        self.insert(Proposal, proposals())
+        return len(created)
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reputation(apps, schema_editor):
+    Account = apps.get_model("users", "Account")
+    Booking = apps.get_model("listings", "Booking")
+    Review = apps.get_model("listings", "Review")
+
+    def aggregate(queryset, group_by, expression):
+        subquery = (
+            queryset.filter(**{group_by: OuterRef("pk")})
+            .order_by()
+            .values(group_by)
+            .annotate(total=expression)
+            .values("total")
+        )
+        return Coalesce(
+            Subquery(subquery, output_field=models.IntegerField()), Value(0)
+        )
+
+    Account.objects.update(
+        rating_sum=aggregate(Review.objects.all(), "reviewed_user", Sum("rating")),
+        rating_count=aggregate(Review.objects.all(), "reviewed_user", Count("pk")),
+        completed_lessons=aggregate(
+            Booking.objects.filter(status="completed"), "listing__user", Count("pk")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_remove_account_role_account_role_level"),
+        ("listings", "0010_availability_availability_user_day_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="completed_lessons",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_reputation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0004_account_completed_lessons_account_rating_count_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(fields=["email"], name="account_email_idx"),
+        ),
+    ]
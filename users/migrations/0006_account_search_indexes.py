@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Case-insensitive admin search: username by prefix (istartswith), email in
+# full (iexact). Each backend compiles those lookups differently, so the
+# indexes matching them differ too.
+INDEXES = {
+    "postgresql": (
+        # UPPER(col::text) LIKE UPPER('term%') and UPPER(col::text) = UPPER(...).
+        "CREATE INDEX account_username_upper_idx "
+        "ON users_account (UPPER(username::text) text_pattern_ops)",
+        "CREATE INDEX account_email_upper_idx ON users_account (UPPER(email::text))",
+    ),
+    "sqlite": (
+        # col LIKE 'term%', which is case-insensitive and can use NOCASE indexes.
+        "CREATE INDEX account_username_nocase_idx "
+        "ON users_account (username COLLATE NOCASE)",
+        "CREATE INDEX account_email_nocase_idx ON users_account (email COLLATE NOCASE)",
+    ),
+}
+
+
+def index_names(statements):
+    return [statement.split()[2] for statement in statements]
+
+
+def install(apps, schema_editor):
+    for statement in INDEXES.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def uninstall(apps, schema_editor):
+    statements = INDEXES.get(schema_editor.connection.vendor, ())
+    for name in index_names(statements):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_account_email_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="account",
+            name="account_email_idx",
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -4,6 +4,9 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
+REPUTATION_FIELDS = ("rating_sum", "rating_count", "completed_lessons")
+
+
 class Account(AbstractUser):
     class Role(models.IntegerChoices):
         STUDENT = 1, "Student"
@@ -16,6 +19,26 @@ class Account(AbstractUser):
     )
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized reputation counters, kept in sync by listings.signals and
+    # repaired by the recompute_reputation management command.
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_lessons = models.PositiveIntegerField(default=0, editable=False)
+
+    # The case-insensitive admin search indexes are vendor specific; see
+    # migration 0006_account_search_indexes.
+
+    def save(self, *args, **kwargs):
+        # The counters are only ever changed with F() updates, so a full save
+        # of a possibly stale instance must not write them back.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in REPUTATION_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def role(self) -> str:
         return self.get_role_level_display()
@@ -55,14 +78,13 @@ class Account(AbstractUser):
 
     @property
     def average_rating(self) -> float:
-        from django.db.models import Avg
-
-        result = self.reviews_received.aggregate(avg=Avg("rating"))
-        return round(result["avg"], 1) if result["avg"] else 0.0
+        if not self.rating_count:
+            return 0.0
+        return round(self.rating_sum / self.rating_count, 1)
 
     @property
     def review_count(self) -> int:
-        return self.reviews_received.count()
+        return self.rating_count
 
     @property
     def is_top_rated(self) -> bool:
@@ -70,8 +92,4 @@ class Account(AbstractUser):
 
     @property
     def completed_lessons_count(self) -> int:
-        from listings.models import Booking
-
-        return Booking.objects.filter(
-            listing__user=self, status=Booking.Status.COMPLETED
-        ).count()
+        return self.completed_lessons
@@ -0,0 +1,59 @@
+"""
+Maintenance of the denormalized reputation counters on ``Account``.
+
+Every change is applied as a single ``UPDATE`` with ``F()`` expressions so
+concurrent reviews and bookings never overwrite each other's increments.
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Account
+
+
+def adjust_rating(user_id: int, rating_delta: int, count_delta: int) -> None:
+    if user_id is None or not (rating_delta or count_delta):
+        return
+    Account.objects.filter(pk=user_id).update(
+        rating_sum=F("rating_sum") + rating_delta,
+        rating_count=F("rating_count") + count_delta,
+    )
+
+
+def adjust_completed_lessons(user_id: int, delta: int) -> None:
+    if user_id is None or not delta:
+        return
+    Account.objects.filter(pk=user_id).update(
+        completed_lessons=F("completed_lessons") + delta
+    )
+
+
+def _aggregate(queryset, group_by: str, expression) -> Coalesce:
+    subquery = (
+        queryset.filter(**{group_by: OuterRef("pk")})
+        .order_by()
+        .values(group_by)
+        .annotate(total=expression)
+        .values("total")
+    )
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+
+def expected_reputation() -> dict:
+    """Annotations computing each counter from the source tables."""
+
+    from listings.models import Booking, Review
+
+    return {
+        "expected_rating_sum": _aggregate(
+            Review.objects.all(), "reviewed_user", Sum("rating")
+        ),
+        "expected_rating_count": _aggregate(
+            Review.objects.all(), "reviewed_user", Count("pk")
+        ),
+        "expected_completed_lessons": _aggregate(
+            Booking.objects.filter(status=Booking.Status.COMPLETED),
+            "tutor",
+            Count("pk"),
+        ),
+    }
@@ -1 +1,175 @@
-# Create your tests here.
+from datetime import date, time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import ChangelistQueryMixin, QueryBudgetMixin, QueryPlanMixin
+from jobs.models import Job, Proposal
+from listings.models import Booking, Listing, Review
+
+from .models import Account
+
+
+class AdminChangelistQueryTests(ChangelistQueryMixin, QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Account.objects.create_user(f"user{i}", email=f"user{i}@example.com")
+
+    def test_account_changelist(self):
+        self.assertChangelistQueries(Account, 4)
+
+    def test_account_search_uses_index(self):
+        queryset = self.assertSearchFinds(Account, "User1@Example.com", 1)
+        self.assertUsesIndex(queryset)
+        self.assertUsesIndex(self.assertSearchFinds(Account, "user2", 1))
+
+    def test_autocomplete_matches_username_prefix(self):
+        self.client.force_login(
+            Account.objects.create_user("admin", is_staff=True, is_superuser=True)
+        )
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "USE",
+                "app_label": "listings",
+                "model_name": "listing",
+                "field_name": "user",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 5)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Account.objects.create_user("tutor", role_level=Account.Role.MENTOR)
+        for i in range(5):
+            other = Account.objects.create_user(f"user{i}")
+            listing = Listing.objects.create(
+                user=cls.user, title=f"Listing {i}", description="Lessons", price=10
+            )
+            booking = Booking.objects.create(
+                listing=listing,
+                student=other,
+                date=date.today(),
+                # One tutor, so the active bookings must not overlap.
+                start_time=time(9 + i),
+                end_time=time(10 + i),
+                duration_hours=1,
+            )
+            Review.objects.create(
+                reviewer=other, reviewed_user=cls.user, booking=booking, rating=5
+            )
+            Review.objects.create(
+                reviewer=cls.user, reviewed_user=other, booking=booking, rating=4
+            )
+            job = Job.objects.create(user=cls.user, title=f"Job {i}", description="d")
+            Proposal.objects.create(job=job, user=other)
+            offer = Job.objects.create(user=other, title=f"Gig {i}", description="d")
+            Proposal.objects.create(job=offer, user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_profile(self):
+        with self.assertMaxQueries("profile"):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, 200)
+
+
+class ReputationCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor, cls.other_tutor, cls.student = (
+            Account.objects.create_user(name, role_level=role)
+            for name, role in (
+                ("tutor", Account.Role.TUTOR),
+                ("other", Account.Role.TUTOR),
+                ("student", Account.Role.STUDENT),
+            )
+        )
+        cls.listing = Listing.objects.create(
+            user=cls.tutor, title="Algebra", description="Lessons", price=10
+        )
+
+    def counters(self, user):
+        user.refresh_from_db()
+        return (user.rating_sum, user.rating_count, user.completed_lessons)
+
+    def book(self, status=Booking.Status.PENDING):
+        return Booking.objects.create(
+            listing=self.listing,
+            student=self.student,
+            date=date.today(),
+            start_time=time(10),
+            end_time=time(11),
+            duration_hours=1,
+            status=status,
+        )
+
+    def recompute(self, *args):
+        out = StringIO()
+        call_command("recompute_reputation", *args, stdout=out)
+        return out.getvalue()
+
+    def test_review_create_edit_reassign_delete(self):
+        review = Review.objects.create(
+            reviewer=self.student, reviewed_user=self.tutor, rating=4
+        )
+        Review.objects.create(reviewer=self.student, reviewed_user=self.tutor, rating=5)
+        self.assertEqual(self.counters(self.tutor), (9, 2, 0))
+
+        review.rating = 2
+        review.save()
+        self.assertEqual(self.counters(self.tutor), (7, 2, 0))
+        self.assertEqual(self.tutor.average_rating, 3.5)
+
+        review.reviewed_user = self.other_tutor
+        review.save()
+        self.assertEqual(self.counters(self.tutor), (5, 1, 0))
+        self.assertEqual(self.counters(self.other_tutor), (2, 1, 0))
+
+        review.delete()
+        self.assertEqual(self.counters(self.other_tutor), (0, 0, 0))
+        self.assertIn("Found 0 account(s)", self.recompute("--dry-run"))
+
+    def test_booking_entering_and_leaving_completed(self):
+        booking = self.book()
+        self.assertEqual(self.counters(self.tutor), (0, 0, 0))
+
+        booking.status = Booking.Status.COMPLETED
+        booking.save()
+        self.assertEqual(self.counters(self.tutor), (0, 0, 1))
+        # Saving again without a status change counts nothing twice.
+        booking.save()
+        self.assertEqual(self.counters(self.tutor), (0, 0, 1))
+
+        booking.status = Booking.Status.CONFIRMED
+        booking.save()
+        self.assertEqual(self.counters(self.tutor), (0, 0, 0))
+
+        self.book(Booking.Status.COMPLETED).delete()
+        self.assertEqual(self.counters(self.tutor), (0, 0, 0))
+        self.assertIn("Found 0 account(s)", self.recompute("--dry-run"))
+
+    def test_recompute_repairs_updates_that_bypass_signals(self):
+        self.book(Booking.Status.COMPLETED)
+        Review.objects.create(reviewer=self.student, reviewed_user=self.tutor, rating=4)
+        Booking.objects.update(status=Booking.Status.CANCELLED)
+        Review.objects.update(rating=1)
+        Account.objects.filter(pk=self.student.pk).update(completed_lessons=3)
+        self.assertEqual(self.counters(self.tutor), (4, 1, 1))
+
+        self.assertIn("Found 2 account(s)", self.recompute("--dry-run"))
+        self.assertEqual(self.counters(self.tutor), (4, 1, 1))
+
+        self.assertIn("Repaired 2 account(s)", self.recompute("--batch-size", "1"))
+        self.assertEqual(self.counters(self.tutor), (1, 1, 0))
+        self.assertEqual(self.counters(self.student), (0, 0, 0))
+        self.assertIn("Found 0 account(s)", self.recompute("--dry-run"))
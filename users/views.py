@@ -7,7 +7,7 @@ from django.views.generic import CreateView, TemplateView
 
 from jobs.models import Job, Proposal
 from listings.models import Listing
-from subscriptions.models import Plan, Subscription
+from subscriptions.models import Subscription, get_plans
 
 from .forms import AccountCreationForm
 
@@ -40,7 +40,7 @@ class ProfileView(LoginRequiredMixin, TemplateView):
         sub = Subscription.objects.filter(user=user).select_related("plan").first()
         context["subscription"] = sub
         context["current_plan_level"] = getattr(user, "role_level", None)
-        context["plans"] = Plan.objects.order_by("level")
+        context["plans"] = get_plans()
 
         # user's content
         context["my_listings"] = Listing.objects.filter(user=user).order_by(
@@ -49,7 +49,7 @@ class ProfileView(LoginRequiredMixin, TemplateView):
         context["my_jobs"] = (
             Job.objects.filter(user=user)
             .order_by("-created_at")
-            .prefetch_related("proposals")
+            .prefetch_related("proposals__user")
         )
         context["my_offers"] = (
             Proposal.objects.filter(user=user)
@@ -57,10 +57,10 @@ class ProfileView(LoginRequiredMixin, TemplateView):
             .order_by("-created_at")[:20]
         )
         context["reviews_received"] = user.reviews_received.select_related(
-            "reviewer", "booking"
+            "reviewer", "booking__listing"
         ).order_by("-created_at")[:10]
         context["reviews_given"] = user.reviews_given.select_related(
-            "reviewed_user", "booking"
+            "reviewed_user", "booking__listing"
         ).order_by("-created_at")[:10]
 
         return context